@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from core_planos import EQUIVALENCIAS_CORE, PRECIOS_CORE
+from motor_costos import PRECIOS_BASE, PriceBook
+
+# ==========================================
+# ALMACÉN DE PRECIOS (SQLITE, VERSIONADO)
+# ==========================================
+# Cada edición de Gerencia crea una versión nueva con fecha de vigencia; nada
+# se sobrescribe. Las cotizaciones guardan el número de versión
+# (version_precios), así que un PDF viejo se puede auditar o recotizar con
+# version(n). Las lecturas pasan por un cache en memoria compartido por todas
+# las sesiones del proceso: las versiones son inmutables y la vigente se
+# refresca al guardar o cada TTL_VIGENTE segundos (por si escribe otro proceso).
+RUTA_DB = os.environ.get("FERROTEK_DB", "ferrotek_precios.db")
+TTL_VIGENTE = 30
+# Lista inicial: la de la vitrina más las claves propias de CoreFerrotek (las compartidas
+# se toman de la vitrina), así Gerencia versiona y edita también los precios del Core
+PRECIOS_INICIALES = {**PRECIOS_BASE, **{k: v for k, v in PRECIOS_CORE.items() if k not in EQUIVALENCIAS_CORE}}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS versiones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vigente_desde TEXT NOT NULL,
+    creada TEXT NOT NULL,
+    autor TEXT,
+    huella TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_versiones_vigencia ON versiones (vigente_desde, id);
+CREATE TABLE IF NOT EXISTS precios (
+    version_id INTEGER NOT NULL REFERENCES versiones (id),
+    clave TEXT NOT NULL,
+    valor REAL NOT NULL,
+    PRIMARY KEY (version_id, clave)
+) WITHOUT ROWID;
+"""
+
+class AlmacenPrecios:
+    def __init__(self, ruta=RUTA_DB):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._versiones = {}   # id -> PriceBook (inmutables, nunca se invalidan)
+        self._vigentes = {}    # fecha ISO -> (id, leído en)
+        with self._conectar() as con:
+            con.executescript(ESQUEMA)
+            if con.execute("SELECT COUNT(*) FROM versiones").fetchone()[0] == 0:
+                self._insertar(con, PriceBook(PRECIOS_INICIALES), "2000-01-01", "sistema")
+        # Bases de antes de versionar las claves del Core: una versión nueva las agrega con su precio de referencia
+        vigente = self.vigente()
+        faltantes = {k: v for k, v in PRECIOS_INICIALES.items() if k not in vigente}
+        if faltantes: self.guardar({**faltantes, **vigente}, autor="sistema")
+
+    @contextmanager
+    def _conectar(self):
+        con = sqlite3.connect(self.ruta, timeout=10)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            with con: yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def _insertar(con, libro, vigente_desde, autor):
+        cur = con.execute("INSERT INTO versiones (vigente_desde, creada, autor, huella) VALUES (?, ?, ?, ?)",
+                          (vigente_desde, datetime.now().isoformat(timespec="seconds"), autor, libro.huella))
+        con.executemany("INSERT INTO precios (version_id, clave, valor) VALUES (?, ?, ?)",
+                        [(cur.lastrowid, k, float(v)) for k, v in libro.items()])
+        return cur.lastrowid
+
+    def version(self, version_id):
+        """PriceBook exacto de una versión (para auditar o recotizar)"""
+        with self._lock:
+            libro = self._versiones.get(version_id)
+        if libro is not None: return libro
+        with self._conectar() as con:
+            filas = con.execute("SELECT clave, valor FROM precios WHERE version_id = ?", (version_id,)).fetchall()
+        if not filas: raise KeyError(f"No existe la versión de precios {version_id}")
+        libro = PriceBook({k: int(v) if float(v).is_integer() else v for k, v in filas}, version=version_id)
+        with self._lock: self._versiones[version_id] = libro
+        return libro
+
+    def vigente(self, fecha=None):
+        """PriceBook vigente en la fecha (hoy por defecto)"""
+        fecha = (fecha or date.today()).isoformat() if not isinstance(fecha, str) else fecha
+        with self._lock:
+            cache = self._vigentes.get(fecha)
+        if cache is None or time.monotonic() - cache[1] > TTL_VIGENTE:
+            with self._conectar() as con:
+                fila = con.execute("SELECT id FROM versiones WHERE vigente_desde <= ? ORDER BY vigente_desde DESC, id DESC LIMIT 1",
+                                   (fecha,)).fetchone()
+            if fila is None: raise KeyError(f"No hay precios vigentes al {fecha}")
+            cache = (fila[0], time.monotonic())
+            with self._lock: self._vigentes[fecha] = cache
+        return self.version(cache[0])
+
+    def guardar(self, precios, vigente_desde=None, autor=None):
+        """Crea una versión nueva salvo que el contenido sea igual al vigente en esa fecha"""
+        libro = precios if isinstance(precios, PriceBook) else PriceBook(precios)
+        vigente_desde = (vigente_desde or date.today()).isoformat() if not isinstance(vigente_desde, str) else vigente_desde
+        actual = self.vigente(vigente_desde)
+        if actual.huella == libro.huella: return actual.version
+        with self._conectar() as con:
+            version_id = self._insertar(con, libro, vigente_desde, autor)
+        with self._lock: self._vigentes.clear()
+        return version_id
+
+    def historial(self, limite=50):
+        with self._conectar() as con:
+            return [dict(zip(("version", "vigente_desde", "creada", "autor"), f)) for f in con.execute(
+                "SELECT id, vigente_desde, creada, autor FROM versiones ORDER BY id DESC LIMIT ?", (limite,))]
+
+_almacenes = {}
+_lock_almacenes = threading.Lock()
+
+def obtener_almacen(ruta=RUTA_DB):
+    """Instancia única por ruta y por proceso (la comparten todas las sesiones)"""
+    with _lock_almacenes:
+        if ruta not in _almacenes: _almacenes[ruta] = AlmacenPrecios(ruta)
+        return _almacenes[ruta]
@@ -1,298 +1,166 @@
 import streamlit as st
-import pandas as pd
-import math
-import os
-from fpdf import FPDF
-from datetime import datetime
+import functools
+import uuid
+import almacen_precios
+import cache_pdf
+import catalogo_imagenes
+import metricas
+import motor_costos
+import registro_cotizaciones
+# pandas, numpy, fpdf y los módulos que los usan se importan en la vista que los
+# necesita: el home y las calculadoras arrancan sin cargarlos (ver benchmark.py, grupo arranque)
 
 # ==========================================
 # 1. CONFIGURACIÓN
 # ==========================================
 st.set_page_config(page_title="Ferrotek | Suite V8", page_icon="🏗️", layout="wide")
+metricas.iniciar_rerun()
 
 # ==========================================
-# 2. MOTOR DE MEZCLAS (FÁBRICA)
-# ==========================================
-DENSIDAD = {'cemento': 1.50, 'arena': 1.60, 'cal': 0.55, 'zeolita': 0.90}
-
-def calcular_produccion_lote(tipo_mezcla, cantidad_bultos_30kg_meta):
-    peso_total = cantidad_bultos_30kg_meta * 30
-    insumos = {}
-    if "Mezcla A" in tipo_mezcla: 
-        f = peso_total / 100.0
-        insumos = {'cemento_kg': 29.5*f, 'arena_kg': 66.5*f, 'carbonato_kg': 4.5*f, 'fibras_kg': 0.1*f, 'cal_kg':0, 'zeolita_kg':0}
-    elif "Mezcla B" in tipo_mezcla: 
-        den_mix = (1*1.5) + (3*1.6) + (3*0.55)
-        u = peso_total / den_mix
-        insumos = {'cemento_kg': u*1.5, 'arena_kg': u*4.8, 'cal_kg': u*1.65, 'carbonato_kg':0, 'zeolita_kg':0}
-    elif "Mezcla T" in tipo_mezcla: 
-        den_mix = (1*1.5) + (2*0.55) + (3*0.9)
-        u = peso_total / den_mix
-        insumos = {'cemento_kg': u*1.5, 'cal_kg': u*1.1, 'zeolita_kg': u*2.7, 'arena_kg':0, 'carbonato_kg':0}
-    return insumos
-
-# ==========================================
-# 3. MOTOR DE COSTOS (V123)
+# 2. MOTOR DE COSTOS (V123)
 # ==========================================
 def calcular_proyecto(input_data, linea_negocio="general", incluye_acabados=True):
-    P = st.session_state['precios_reales']
+    metricas.contar("cotizaciones")
     margen = st.session_state['margen'] / 100
-    
-    lista_mat = [] 
-    nota_tecnica = ""
-    
-    # --- DOMOS ---
-    if linea_negocio == "domo":
-        ancho = input_data['ancho']; fondo = input_data['fondo']
-        alt_m = 0.80; radio = ancho/2.0; alt_c = alt_m + radio 
-        
-        perim_arco = (math.pi * radio) + (alt_m * 2)
-        area_timp = (math.pi * radio**2) + (2 * ancho * alt_m)
-        area_tot = (perim_arco * fondo) + area_timp
-        
-        num_arcos = math.ceil(fondo/0.6) + 1
-        ml_pgc_tot = (num_arcos * perim_arco) + (area_timp * 3.5)
-        cant_tubos = math.ceil(ml_pgc_tot / 6.0)
-        cant_malla = math.ceil(area_tot * 2.1) 
-        cant_cemento = math.ceil(area_tot * 0.35) 
-        cant_arena = math.ceil(area_tot * 0.05)
-        
-        lista_mat = [
-            {"Insumo": "Perfil Estructural PGC 90x40 Cal.22 (6m)", "Cant": cant_tubos, "Unid": "Tubos", "Costo": cant_tubos * 6 * P['perfil_pgc90_ml']},
-            {"Insumo": "Malla Electrosoldada 5mm (15x15)", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla * P['malla_5mm_m2']},
-            {"Insumo": "Cemento Estructural (Tipo ART)", "Cant": cant_cemento, "Unid": "Bultos", "Costo": cant_cemento * P['cemento_gris_50kg']},
-            {"Insumo": "Arena de Río Lavada", "Cant": cant_arena, "Unid": "m3", "Costo": cant_arena * P['arena_rio_m3']},
-            {"Insumo": "Tornillería Wafer/Extraplanos", "Cant": math.ceil(area_tot*40), "Unid": "Und", "Costo": area_tot * 40 * 150},
-            {"Insumo": "Anclajes Cimentación 3/8", "Cant": math.ceil(fondo/0.6)*2, "Unid": "Und", "Costo": math.ceil(fondo/0.6)*2 * 2500}
-        ]
-        
-        c_mat = sum([item['Costo'] for item in lista_mat]) 
-        c_mo = math.ceil(ancho*fondo/2.0) * P['dia_cuadrilla']
-        c_acab = (ancho*fondo * P.get('valor_acabados_vis_m2', 350000)) if incluye_acabados else 0
-        total = c_mat + c_mo + c_acab
-        
-        nota_tecnica = "DISEÑO: Oriente el ventanal al NORTE/SUR. Use 'Barn Doors' (Corredizas) para separar cocina."
-        
-        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
-                "geo": {"h": alt_c, "area": area_tot}, 
-                "desglose": {"mat":c_mat, "mo":c_mo, "acab":c_acab}, "materiales": lista_mat, "nota": nota_tecnica}
-
-    # --- MUROS ---
-    elif linea_negocio == "muro":
-        ml = input_data['ml']; alt = input_data['altura']; area = ml*alt
-        tipo = input_data['tipo']; es_doble = "Doble" in tipo
-        
-        f_perf = 1.8 if es_doble else 1.5 
-        f_malla = 2.1 if es_doble else 1.1 
-        f_cem = 0.4 if es_doble else 0.25 
-        
-        ml_perf = area * f_perf
-        cant_tubos = math.ceil(ml_perf / 6.0)
-        cant_malla = math.ceil(area * f_malla)
-        cant_cemento = math.ceil(area * f_cem)
-        
-        cant_tornillos = math.ceil(area * 30)
-        cant_anclajes = math.ceil(ml / 0.60) 
-        
-        vol_cinta = ml * 0.20 * 0.25
-        cant_cem_cim = math.ceil(vol_cinta * 7)
-        cant_arena_cim = vol_cinta * 1.1
-        
-        lista_mat = [
-            {"Insumo": "Perfil PGC 90x40 Cal.22 (Parales)", "Cant": cant_tubos, "Unid": "Tubos", "Costo": cant_tubos*6*P['perfil_pgc90_ml']},
-            {"Insumo": "Malla Electrosoldada 4mm/5mm", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla*P['malla_5mm_m2']},
-            {"Insumo": "Tornillería Extraplana (Wafer)", "Cant": cant_tornillos, "Unid": "Und", "Costo": cant_tornillos * 150},
-            {"Insumo": "Pernos Expansivos 3/8 (Anclaje)", "Cant": cant_anclajes, "Unid": "Und", "Costo": cant_anclajes * 3500},
-            {"Insumo": "Cemento Gris (Muro + Cimentación)", "Cant": cant_cemento+cant_cem_cim, "Unid": "Bultos", "Costo": (cant_cemento+cant_cem_cim)*P['cemento_gris_50kg']},
-            {"Insumo": "Arena Lavada (Mezcla A)", "Cant": math.ceil(cant_arena_cim), "Unid": "m3", "Costo": (cant_arena_cim)*P['arena_rio_m3']}
-        ]
-        
-        c_mat = sum([item['Costo'] for item in lista_mat])
-        c_mo = (area/5.0 * P['dia_cuadrilla']) * (1.5 if es_doble else 1.0)
-        total = c_mat + c_mo
-        
-        nota_tecnica = "NORMA: Curado con agua 3 veces/día por 4 días. Anclaje inferior obligatorio cada 60cm."
-        
-        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
-                "desglose": {"mat":c_mat, "mo":c_mo, "acab":0}, "materiales": lista_mat, "nota": nota_tecnica}
-
-    # --- CASAS ---
-    elif linea_negocio == "casa":
-        area = input_data['area']
-        estilo = input_data.get('estilo', 'Tradicional')
-        
-        if estilo == 'Tradicional':
-            fac_muros = 2.8; fac_techo = 1.4; nom_teja = "Teja PVC Colonial (Roja)"; p_teja = 60000
-        else: # Serie M
-            fac_muros = 2.6; fac_techo = 1.2; nom_teja = "Teja PVC Termoacústica (Blanca)"; p_teja = 45000
-
-        area_muros = area * fac_muros
-        area_techo = area * fac_techo
-        
-        cant_tubos_muro = math.ceil((area_muros * 1.5) / 6.0)
-        cant_tubos_techo = math.ceil((area_techo * 1.2) / 6.0)
-        cant_malla = math.ceil(area_muros * 2.2)
-        cant_cemento = math.ceil(area_muros * 0.35 + (area*0.1*7))
-        cant_tejas = math.ceil(area_techo / 1.8)
-        
-        cant_tornillos = math.ceil((area_muros + area_techo) * 35)
-        cant_kit_teja = math.ceil(area_techo * 4) 
-        
-        lista_mat = [
-            {"Insumo": "Perfil PGC 90x40 Cal.22 (Total)", "Cant": cant_tubos_muro+cant_tubos_techo, "Unid": "Tubos", "Costo": (cant_tubos_muro+cant_tubos_techo)*6*P['perfil_pgc90_ml']},
-            {"Insumo": f"Cubierta: {nom_teja}", "Cant": cant_tejas, "Unid": "Hojas", "Costo": cant_tejas*1.8*p_teja},
-            {"Insumo": "Kit Fijación Teja", "Cant": cant_kit_teja, "Unid": "Und", "Costo": cant_kit_teja * 800},
-            {"Insumo": "Tornillería Estructura (Wafer)", "Cant": cant_tornillos, "Unid": "Und", "Costo": cant_tornillos * 150},
-            {"Insumo": "Malla Electrosoldada 5mm", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla*P['malla_5mm_m2']},
-            {"Insumo": "Cemento Estructural (Gris)", "Cant": cant_cemento, "Unid": "Bultos", "Costo": cant_cemento*P['cemento_gris_50kg']},
-            {"Insumo": "Agregados (Arena/Triturado)", "Cant": math.ceil(area*0.2), "Unid": "m3", "Costo": math.ceil(area*0.2)*P['arena_rio_m3']}
-        ]
-        
-        c_mat = sum([item['Costo'] for item in lista_mat]) 
-        c_mo = area * P['dia_cuadrilla'] * 1.1
-        c_acab = (area * P['valor_acabados_m2']) if incluye_acabados else 0
-        total = c_mat + c_mo + c_acab
-        
-        nota_tecnica = "DISEÑO: Dejar paso lateral de 90cm en el lote. Comedor con vista al patio (ventanal grande)."
-        
-        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
-                "desglose": {"mat": c_mat, "mo": c_mo, "acab": c_acab}, "materiales": lista_mat, "nota": nota_tecnica}
-
-    # --- AGUA ---
-    elif linea_negocio == "agua":
-        vol = input_data['vol']; h = 1.5; r = math.sqrt(vol/(math.pi*h)); area_m = 2*math.pi*r*h
-        cant_malla = math.ceil(area_m * 4)
-        cant_cemento = math.ceil(area_m * 0.6)
-        
-        lista_mat = [
-            {"Insumo": "Malla Hexagonal + Electrosoldada", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla*P['malla_5mm_m2']},
-            {"Insumo": "Cemento Impermeable / Holcim", "Cant": cant_cemento, "Unid": "Bultos", "Costo": cant_cemento*P['cemento_gris_50kg']},
-            {"Insumo": "Impermeabilizante Integral (Sika)", "Cant": 1, "Unid": "Kit", "Costo": 200000}
-        ]
-        c_mat = sum([item['Costo'] for item in lista_mat])
-        c_mo = area_m/2.0 * P['dia_cuadrilla']
-        total = c_mat + c_mo
-        
-        nota_tecnica = "NORMA: Vibrado manual obligatorio. Usar aditivo impermeabilizante."
-        
-        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
-                "desglose": {"mat":c_mat, "mo":c_mo, "acab":0}, "materiales": lista_mat, "nota": nota_tecnica}
-
-    return {"precio": 0}
+    with metricas.tramo("cotizacion"):
+        res = motor_costos.calcular_proyecto_cacheado(input_data, linea_negocio, incluye_acabados, libro, margen)
+    # Una fila "cotizada" por combinación vista en la sesión, no por rerun
+    clave = (linea_negocio, tuple(sorted(input_data.items())), incluye_acabados, margen, res.get('version_precios'))
+    vistas = st.session_state.setdefault('cotizaciones_vistas', set())
+    if clave not in vistas:
+        vistas.add(clave)
+        registro.registrar(linea_negocio, input_data, incluye_acabados, res, margen, sesion=st.session_state['sesion'])
+    return res
 
-# ==========================================
-# 4. GENERADOR PDF (FIRMADO V124)
-# ==========================================
-class PDFDossier(FPDF):
-    def header(self):
-        self.set_font('Arial', 'B', 16); self.cell(0, 10, 'FERROTEK S.A.S', 0, 1, 'C')
-        self.set_font('Arial', 'I', 10); self.cell(0, 10, 'Innovación Constructiva', 0, 1, 'C'); self.ln(5)
-
-    def generar_guia_diseno(self):
-        self.add_page()
-        self.set_font('Arial', 'B', 20); self.set_text_color(0, 51, 102)
-        self.cell(0, 15, "FILOSOFIA DE DISEÑO FERROTEK", 0, 1, 'C')
-        self.line(10, 25, 200, 25); self.ln(10)
-        self.set_text_color(0); self.set_font('Arial', 'B', 12); self.cell(0, 10, "1. EL METRO CUADRADO UTIL", 0, 1)
-        self.set_font('Arial', '', 11); self.multi_cell(0, 6, "Gane hasta 4 m2 adicionales de espacio útil gracias a nuestros muros de alta resistencia y bajo espesor.")
-        self.ln(5)
-        self.set_font('Arial', 'B', 12); self.cell(0, 10, "2. FLEXIBILIDAD", 0, 1)
-        self.set_font('Arial', '', 11); self.multi_cell(0, 6, "Bóvedas sin columnas internas. Use puertas corredizas para espacios dinámicos.")
-        self.ln(5)
-        self.set_font('Arial', 'I', 10); self.set_text_color(100); self.cell(0, 10, "Ferrotek: Asesoria Arquitectonica Incluida.", 0, 1, 'C')
-
-def generar_pdf_cotizacion(cliente, proyecto, datos, desc):
-    pdf = PDFDossier(); pdf.add_page(); pdf.set_font('Arial', '', 12)
-    
-    # DATOS DEL CLIENTE (DESTACADO)
-    pdf.set_fill_color(240, 240, 240)
-    pdf.cell(0, 10, f"PARA: {cliente.upper()}", 0, 1, 'L', 1)
-    pdf.cell(0, 10, f"FECHA: {datetime.now().strftime('%d/%m/%Y')}", 0, 1, 'L')
-    pdf.ln(5)
-    
-    # TITULO Y DESCRIPCION
-    pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, f"REF: {proyecto.upper()}", 0, 1)
-    pdf.set_font('Arial', '', 11); pdf.multi_cell(0, 6, desc); pdf.ln(8)
-    
-    # PRECIO (RESALTADO)
-    pdf.set_fill_color(220, 230, 240)
-    pdf.set_font('Arial', 'B', 16); pdf.cell(0, 15, f"INVERSION TOTAL: ${datos['precio']:,.0f}", 0, 1, 'C', 1)
-    
-    # NOTA TECNICA
-    pdf.ln(5)
-    if 'nota' in datos:
-        pdf.set_font('Arial', 'B', 9); pdf.set_text_color(100, 0, 0)
-        pdf.multi_cell(0, 5, f"NOTA TECNICA: {datos['nota']}")
-        pdf.set_text_color(0)
-    
-    # CONDICIONES
-    pdf.ln(5); pdf.set_font('Arial', 'I', 8)
-    pdf.multi_cell(0, 4, "Validez: 15 días. Forma de pago: 50% Anticipo, 50% Avance de Obra. Incluye dirección técnica.")
-    
-    # FIRMA DEL GERENTE (NUEVO)
-    pdf.ln(25)
-    pdf.set_font('Arial', 'B', 11)
-    pdf.cell(0, 5, "______________________________________", 0, 1)
-    pdf.cell(0, 5, "MANUEL ENRIQUE PRADA FORERO", 0, 1)
-    pdf.set_font('Arial', '', 10)
-    pdf.cell(0, 5, "Gerente General | Ferrotek S.A.S", 0, 1)
-    pdf.cell(0, 5, "Abogado & Director Jurídico", 0, 1)
-    
-    return bytes(pdf.output(dest='S'))
+def pdf_cotizacion(cliente, proyecto, datos, desc, linea, entrada, acabados=True):
+    # Diferido: st.download_button llama a la función solo cuando se pide la descarga
+    metricas.contar("pdf_ofrecidos")
+    margen = st.session_state['margen'] / 100; sesion = st.session_state['sesion']
+    def generar():
+        from documentos_pdf import generar_pdf_cotizacion
+        with metricas.descarga("pdf_cotizacion") as medida:
+            pdf = cache_pdf.obtener_cotizacion(cliente, proyecto, datos, desc, generar_pdf_cotizacion); medida["bytes"] = len(pdf)
+        registro.registrar(linea, entrada, acabados, datos, margen, evento="emitida", cliente=cliente, proyecto=proyecto, sesion=sesion)
+        return pdf
+    return generar
 
-def generar_portafolio(tipo="master"):
-    pdf = PDFDossier()
-    if tipo == "guia": 
-        pdf.generar_guia_diseno()
-        return bytes(pdf.output(dest='S'))
-        
-    pdf.add_page()
-    pdf.set_font('Arial', 'B', 24); pdf.set_text_color(0, 51, 102); pdf.cell(0, 20, "PORTAFOLIO FERROTEK", 0, 1, 'C')
-    pdf.set_font('Arial', '', 11); pdf.set_text_color(0)
-    if tipo in ["master", "casas"]:
-        pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, "1. LINEA VIVIENDA", 0, 1)
-        pdf.multi_cell(0, 6, "A. SERIE TRADICIONAL: Techo PVC 2 aguas.\nB. SERIE M: Minimalista cúbica.")
-        pdf.ln(5)
-    if tipo in ["master", "muros"]:
-        pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, "2. LINEA MUROS", 0, 1); pdf.multi_cell(0, 6, "Cerramientos alta resistencia."); pdf.ln(5)
-    if tipo in ["master", "domos"]:
-        pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, "3. LINEA DOMOS", 0, 1); pdf.multi_cell(0, 6, "Bóvedas evolutivas."); pdf.ln(5)
-    return bytes(pdf.output(dest='S'))
+def pdf_portafolio(tipo):
+    metricas.contar("pdf_ofrecidos")
+    def generar():
+        from documentos_pdf import generar_portafolio
+        with metricas.descarga("pdf_portafolio") as medida:
+            pdf = cache_pdf.obtener_pdf(tipo, generar_portafolio); medida["bytes"] = len(pdf)
+        return pdf
+    return generar
 
 # ==========================================
-# 5. SIDEBAR
+# 3. SIDEBAR
 # ==========================================
 with st.sidebar:
     st.markdown("### Acceso Corporativo"); pwd = st.text_input("Clave:", type="password")
-    defaults = {'cemento_gris_50kg': 29500, 'cal_hidratada_25kg': 25000, 'arena_rio_m3': 98000, 
-        'malla_5mm_m2': 28000, 'perfil_pgc90_ml': 18500, 'dia_cuadrilla': 250000, 'valor_acabados_m2': 450000, 'valor_acabados_vis_m2': 350000}
-    if 'precios_reales' not in st.session_state: st.session_state['precios_reales'] = defaults
+    almacen = almacen_precios.obtener_almacen()
+    libro = almacen.vigente()
+    registro = registro_cotizaciones.obtener_registro()
     if 'margen' not in st.session_state: st.session_state['margen'] = 30
+    if 'sesion' not in st.session_state: st.session_state['sesion'] = uuid.uuid4().hex
     es_admin = (pwd == "ferrotek2026")
     if es_admin:
         st.success("Gerencia Activa"); st.session_state['margen'] = st.slider("Margen %", 10, 60, 30)
-        with st.expander("Costos Base"): st.session_state['precios_reales'] = st.data_editor(st.session_state['precios_reales'], key="p_edit")
+        with st.expander("Costos Base"):
+            editado = st.data_editor(dict(libro), key="p_edit")
+            if editado != dict(libro):
+                try:
+                    libro = almacen.version(almacen.guardar(editado, autor="gerencia"))
+                except ValueError as e:
+                    st.error(str(e))
+            st.caption(f"Lista de precios v{libro.version}")
+        with st.expander("Versiones de Precios"):
+            import pandas as pd
+            st.dataframe(pd.DataFrame(almacen.historial(20)), hide_index=True, use_container_width=True)
+        st.button("📋 Lista de Precios", on_click=lambda: set_view('lista'), use_container_width=True)
+        st.button("📦 Cotización Masiva", on_click=lambda: set_view('masivo'), use_container_width=True)
+        st.button("🏭 Fábrica", on_click=lambda: set_view('fabrica'), use_container_width=True)
+        # El interruptor es de todo el proceso: cada sesión muestra el estado actual y solo lo cambia al pulsarlo
+        st.session_state['tgl_metricas'] = metricas.activo()
+        st.toggle("Medir rendimiento", key="tgl_metricas", on_change=lambda: metricas.activar(st.session_state['tgl_metricas']))
+        st.button("📈 Métricas", on_click=lambda: set_view('metricas'), use_container_width=True)
+        with st.expander("Cache Cotizaciones"):
+            est_cot = motor_costos.CACHE_COTIZACIONES.estadisticas()
+            c1, c2 = st.columns(2)
+            c1.metric("Aciertos", est_cot['aciertos']); c2.metric("Fallos", est_cot['fallos'])
+            st.caption(f"Entradas: {est_cot['entradas']} / {est_cot['capacidad']}")
+        with st.expander("Cache Documentos"):
+            est_pdf = cache_pdf.estadisticas()
+            c1, c2 = st.columns(2)
+            c1.metric("Aciertos", est_pdf['aciertos']); c2.metric("Fallos", est_pdf['fallos'])
+            if est_pdf['frio_ms'] is not None: st.caption(f"Render en frío: {est_pdf['frio_ms']:.1f} ms")
+            if est_pdf['caliente_ms'] is not None: st.caption(f"Servido desde cache: {est_pdf['caliente_ms']:.3f} ms")
+            est_cot = cache_pdf.estadisticas_cotizaciones()
+            st.caption(f"Cotizaciones: {est_cot['renders']} renders ({est_cot['render_ms']:,.0f} ms), "
+                       f"{est_cot['aciertos']} descargas desde cache")
+            est_img = catalogo_imagenes.estadisticas()
+            st.caption(f"Imágenes compartidas: {est_img['entradas']} en memoria, {est_img['aciertos']} lecturas ahorradas")
+        with st.expander("Registro de Cotizaciones"):
+            est_reg = registro.estadisticas()
+            c1, c2 = st.columns(2)
+            c1.metric("Escritas", est_reg['filas']); c2.metric("En memoria", est_reg['pendientes'])
+            st.caption(f"{est_reg['archivos']} archivos Parquet en {registro.carpeta} · {est_reg['compactaciones']} compactaciones")
 
 if 'view' not in st.session_state: st.session_state.view = 'home'
 def set_view(name): st.session_state.view = name
 
 # ==========================================
-# 6. VISTAS
+# 4. VISTAS
 # ==========================================
 def mostrar_desglose(data):
-    if 'nota' in data:
-        st.info(f"ℹ️ {data['nota']}") 
+    with metricas.tramo("desglose"):
+        if 'nota' in data:
+            st.info(f"ℹ️ {data['nota']}") 
     
-    if es_admin:
-        st.markdown("---")
-        st.markdown("##### 🕵️ Auditoría Financiera")
-        c1, c2, c3 = st.columns(3)
-        c1.metric("🧱 Materiales", f"${data['desglose']['mat']:,.0f}")
-        c2.metric("👷 Mano de Obra", f"${data['desglose']['mo']:,.0f}")
-        c3.success(f"📈 UTILIDAD: ${data['utilidad']:,.0f}")
-        with st.expander("📦 LISTA DE MATERIALES (LOGÍSTICA)"):
-            if 'materiales' in data:
-                st.dataframe(pd.DataFrame(data['materiales']), hide_index=True, use_container_width=True)
+        if es_admin:
+            st.markdown("---")
+            st.markdown("##### 🕵️ Auditoría Financiera")
+            c1, c2, c3 = st.columns(3)
+            c1.metric("🧱 Materiales", f"${data['desglose']['mat']:,.0f}")
+            c2.metric("👷 Mano de Obra", f"${data['desglose']['mo']:,.0f}")
+            c3.success(f"📈 UTILIDAD: ${data['utilidad']:,.0f}")
+            with st.expander("📦 LISTA DE MATERIALES (LOGÍSTICA)"):
+                if 'materiales' in data:
+                    import pandas as pd
+                    st.dataframe(pd.DataFrame(data['materiales']), hide_index=True, use_container_width=True)
+
+def mostrar_riesgo(linea, entrada, acab=True, clave=None):
+    if not es_admin: return
+    import riesgo_precios
+    with st.expander(f"🎲 Riesgo de Precios ({riesgo_precios.VIGENCIA_DIAS} días de vigencia)"):
+        c1, c2 = st.columns(2)
+        umbral = c1.slider("Margen mínimo aceptable (%)", 0, 50, 15, key=f"umb_{clave or linea}")
+        simular = c2.checkbox("Simular 100.000 escenarios", key=f"sim_{clave or linea}")
+        if simular:
+            with metricas.tramo("riesgo"):
+                sim = riesgo_precios.simular(linea, entrada, libro, st.session_state['margen']/100, acab, umbral=umbral/100)
+            c1, c2, c3 = st.columns(3)
+            c1.metric(f"P(margen < {umbral}%)", f"{sim['p_bajo_umbral']:.1%}")
+            c2.metric("P(pérdida)", f"{sim['p_perdida']:.1%}")
+            c3.metric("Utilidad mediana", f"${sim['p50']:,.0f}")
+            st.caption(f"Utilidad P5–P95: ${sim['p5']:,.0f} – ${sim['p95']:,.0f}")
+            import numpy as np
+            import pandas as pd
+            conteo, bordes = np.histogram(sim['margen'] * 100, bins=40)
+            st.bar_chart(pd.DataFrame({"Escenarios": conteo}, index=np.round((bordes[:-1] + bordes[1:]) / 2, 1)))
+
+def calculadora(vista):
+    """Fragmento por línea: sus widgets reejecutan solo la calculadora, no el sidebar ni el contenido estático"""
+    def decorar(fn):
+        @st.fragment
+        @functools.wraps(fn)
+        def fragmento():
+            with metricas.fragmento(vista): fn()
+        return fragmento
+    return decorar
+
+def pedir_presupuesto(clave):
+    return st.number_input("Presupuesto del cliente ($):", 0, step=1_000_000, key=f"pres_{clave}")
 
 # --- HOME ---
 if st.session_state.view == 'home':
@@ -300,9 +168,9 @@ if st.session_state.view == 'home':
     
     st.markdown("### 📂 Centro de Documentación")
     c1, c2, c3 = st.columns(3)
-    with c1: st.download_button("📘 Portafolio Master", generar_portafolio("master"), "Master.pdf", "application/pdf", use_container_width=True)
-    with c2: st.download_button("🏠 Brochure Casas", generar_portafolio("casas"), "Casas.pdf", "application/pdf", use_container_width=True)
-    with c3: st.download_button("🎁 Guía de Diseño", generar_portafolio("guia"), "Guia_Diseno.pdf", "application/pdf", use_container_width=True)
+    with c1: st.download_button("📘 Portafolio Master", pdf_portafolio("master"), "Master.pdf", "application/pdf", use_container_width=True)
+    with c2: st.download_button("🏠 Brochure Casas", pdf_portafolio("casas"), "Casas.pdf", "application/pdf", use_container_width=True)
+    with c3: st.download_button("🎁 Guía de Diseño", pdf_portafolio("guia"), "Guia_Diseno.pdf", "application/pdf", use_container_width=True)
     
     st.markdown("---")
     c1, c2, c3, c4 = st.columns(4)
@@ -312,42 +180,64 @@ if st.session_state.view == 'home':
     with c4: st.button("💧 Agua", on_click=lambda: set_view('agua'), use_container_width=True)
     
     st.markdown("---")
-    st.subheader("📸 Galería de Proyectos")
-    imgs = [f for f in os.listdir('.') if f.endswith(('.png','.jpg','.jpeg'))]
-    if imgs:
-        cols = st.columns(3)
-        for i, img in enumerate(imgs):
-            with cols[i % 3]:
-                st.image(img, caption=img.split('.')[0].replace('_', ' ').title(), use_container_width=True)
-    else:
-        st.info("No hay imágenes en la carpeta. Sube tus renders para verlos aquí.")
+    # La galería lista y lee todas las imágenes: se carga solo si el visitante la abre
+    if st.toggle("📸 Galería de Proyectos", key="tgl_galeria"):
+        with metricas.tramo("galeria"):
+            imgs = catalogo_imagenes.catalogo()
+            if imgs:
+                cols = st.columns(3)
+                for i, img in enumerate(imgs):
+                    with cols[i % 3]:
+                        if st.session_state.get('img_original') == img['nombre']:
+                            st.image(catalogo_imagenes.leer(img['nombre']), caption=img['leyenda'], use_container_width=True); metricas.contar("imagenes")
+                            st.button("Cerrar", key=f"min_{img['nombre']}", on_click=lambda: st.session_state.pop('img_original', None))
+                        else:
+                            st.image(catalogo_imagenes.leer(catalogo_imagenes.ruta_miniatura(img['nombre'], catalogo_imagenes.ANCHOS[0])), caption=img['leyenda'], use_container_width=True); metricas.contar("imagenes")
+                            st.button("🔍 Ver original", key=f"img_{img['nombre']}", on_click=lambda n=img['nombre']: st.session_state.update(img_original=n))
+            else:
+                st.info("No hay imágenes en la carpeta. Sube tus renders para verlos aquí.")
 
 # --- CASAS ---
 elif st.session_state.view == 'casas':
     st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("🏠 Línea Vivienda")
+    with st.expander("💰 ¿Qué construyo con mi presupuesto?"):
+        presupuesto = pedir_presupuesto("casa")
+        if presupuesto:
+            import pandas as pd
+            import solucionador
+            opciones = solucionador.casas(presupuesto, libro, st.session_state['margen'] / 100)
+            if opciones:
+                st.dataframe(pd.DataFrame(opciones).rename(columns={"modelo": "Modelo", "area": "Área (m2)", "llave_en_mano": "Llave en Mano", "precio": "Precio"}),
+                             hide_index=True, use_container_width=True)
+            else: st.warning("El presupuesto no alcanza para ningún modelo del catálogo.")
     tab_trad, tab_mod = st.tabs(["🏡 TRADICIONAL", "🏗️ SERIE M"])
     
     with tab_trad:
         c1, c2 = st.columns(2)
-        with c1:
+        @calculadora("casas")
+        def casa_tradicional():
             mod_t = st.selectbox("Modelo:", ["T-1 (30m2)", "T-2 (48m2)", "T-3 (70m2)"])
             area_t = int(mod_t.split()[1].replace("m2)","").replace("(",""))
             full_t = st.checkbox("Llave en Mano", True, key="chk_t")
             data_t = calcular_proyecto({'area': area_t, 'estilo': 'Tradicional'}, "casa", full_t)
             st.metric("Inversión", f"${data_t['precio']:,.0f}")
             mostrar_desglose(data_t)
+            mostrar_riesgo("casa", {'area': area_t, 'estilo': 'Tradicional'}, full_t, "casa_t")
             cli_t = st.text_input("Nombre del Cliente:", key="cli_txt_t")
             if cli_t:
                 desc_pdf = f"Modelo: {mod_t}. Estilo: Tradicional (PVC 2 Aguas). Área: {area_t}m2. Incluye acabados y pintura."
-                st.download_button("PDF", generar_pdf_cotizacion(cli_t, "Casa Tradicional", data_t, desc_pdf), "cot_trad.pdf")
+                st.download_button("PDF", pdf_cotizacion(cli_t, "Casa Tradicional", data_t, desc_pdf, "casa", {'area': area_t, 'estilo': 'Tradicional'}, full_t), "cot_trad.pdf")
+        with c1: casa_tradicional()
         with c2: 
             st.info("Techo PVC Colonial, Aleros.")
             try:
-                st.image("vis_familiar.png", width=400)
+                st.image(catalogo_imagenes.leer("vis_familiar.png"), width=400)
             except:
                 pass
 
-    with tab_mod:
+    # Serie M: la imagen depende del modelo elegido, así que el fragmento abarca las dos columnas
+    @calculadora("casas")
+    def casa_serie_m():
         c1, c2 = st.columns(2)
         with c1:
             mod_m = st.selectbox("Modelo:", ["M-2 (45m2)", "M-3 (70m2)"])
@@ -356,35 +246,47 @@ elif st.session_state.view == 'casas':
             data_m = calcular_proyecto({'area': area_m, 'estilo': 'Serie M'}, "casa", full_m)
             st.metric("Inversión", f"${data_m['precio']:,.0f}")
             mostrar_desglose(data_m)
+            mostrar_riesgo("casa", {'area': area_m, 'estilo': 'Serie M'}, full_m, "casa_m")
             cli_m = st.text_input("Nombre del Cliente:", key="cli_txt_m")
             if cli_m:
                 desc_pdf = f"Modelo: {mod_m}. Estilo: Serie M (Cúbica). Área: {area_m}m2. Diseño Minimalista."
-                st.download_button("PDF", generar_pdf_cotizacion(cli_m, "Casa Serie M", data_m, desc_pdf), "cot_mod.pdf")
+                st.download_button("PDF", pdf_cotizacion(cli_m, "Casa Serie M", data_m, desc_pdf, "casa", {'area': area_m, 'estilo': 'Serie M'}, full_m), "cot_mod.pdf")
         with c2: 
             st.success("Diseño Cúbico, Wet-Wall.")
             try:
-                st.image("vivienda_suite.png" if "M-2" in mod_m else "vivienda_master.png", width=400)
+                st.image(catalogo_imagenes.leer("vivienda_suite.png" if "M-2" in mod_m else "vivienda_master.png"), width=400)
             except:
                 pass
+    with tab_mod: casa_serie_m()
 
 # --- MUROS ---
 elif st.session_state.view == 'muros':
     st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("🧱 Línea Muros")
     c1, c2 = st.columns(2)
-    with c1:
+    @calculadora("muros")
+    def calculadora_muro():
         tipo = st.radio("Tipo:", ["Tipo 2 (Sencillo)", "Tipo 1 (Doble)"])
         ml = st.number_input("Largo (m):", 10.0); alt = st.number_input("Alto (m):", 2.2)
         data = calcular_proyecto({'ml':ml, 'altura':alt, 'tipo':tipo}, "muro")
         st.metric("Inversión", f"${data['precio']:,.0f}")
         mostrar_desglose(data)
+        mostrar_riesgo("muro", {'ml':ml, 'altura':alt, 'tipo':tipo})
+        with st.expander("💰 ¿Qué construyo con mi presupuesto?"):
+            presupuesto = pedir_presupuesto("muro")
+            if presupuesto:
+                import solucionador
+                sol = solucionador.muro(presupuesto, alt, tipo, libro, st.session_state['margen'] / 100)
+                if sol: st.success(f"Hasta {sol['ml']:.1f} m de {tipo} a {alt} m de alto: ${sol['precio']:,.0f}")
+                else: st.warning("El presupuesto no alcanza para 1 m de muro.")
         cli_muro = st.text_input("Nombre del Cliente:", key="cli_txt_muro")
         if cli_muro: 
             desc_pdf = f"Muro {tipo}. Dimensiones: {ml}m Largo x {alt}m Alto. Área Total: {ml*alt:.2f} m2. Sistema Ferrotek."
-            st.download_button("PDF", generar_pdf_cotizacion(cli_muro, "Muro Perimetral", data, desc_pdf), "cot.pdf")
+            st.download_button("PDF", pdf_cotizacion(cli_muro, "Muro Perimetral", data, desc_pdf, "muro", {'ml':ml, 'altura':alt, 'tipo':tipo}), "cot.pdf")
+    with c1: calculadora_muro()
     with c2: 
         st.info("Cerramientos de alta resistencia.")
         try:
-            st.image("muro_perimetral.png", use_container_width=True)
+            st.image(catalogo_imagenes.leer("muro_perimetral.png"), use_container_width=True)
         except:
             pass
 
@@ -392,22 +294,33 @@ elif st.session_state.view == 'muros':
 elif st.session_state.view == 'domos':
     st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("🌾 Línea Domos")
     c1, c2 = st.columns(2)
-    with c1:
+    @calculadora("domos")
+    def calculadora_domo():
         uso = st.selectbox("Uso:", ["Vivienda (6m)", "Garage (3.8m)", "Personalizado"])
         w = 6.0 if "Vivienda" in uso else 3.8 if "Garage" in uso else 5.0
         ancho = st.number_input("Frente:", 2.0, 15.0, w); fondo = st.number_input("Fondo:", 3.0, 50.0, 10.0)
         full = st.checkbox("Acabados", True if "Vivienda" in uso else False)
         data = calcular_proyecto({'ancho':ancho, 'fondo':fondo}, "domo", full)
         st.metric("Inversión", f"${data['precio']:,.0f}")
+        st.success(f"Altura: {data['geo']['h']:.2f}m")
         mostrar_desglose(data)
+        mostrar_riesgo("domo", {'ancho':ancho, 'fondo':fondo}, full)
+        with st.expander("💰 ¿Qué construyo con mi presupuesto?"):
+            presupuesto = pedir_presupuesto("domo")
+            fijar = st.checkbox(f"Mantener frente de {ancho} m", True, key="fij_domo")
+            if presupuesto:
+                import solucionador
+                sol = solucionador.domo(presupuesto, libro, st.session_state['margen'] / 100, full, ancho if fijar else None)
+                if sol: st.success(f"Hasta {sol['ancho']:.1f} m x {sol['fondo']:.1f} m (altura {sol['h']:.2f} m): ${sol['precio']:,.0f}")
+                else: st.warning("El presupuesto no alcanza para el domo mínimo con estas condiciones.")
         cli_domo = st.text_input("Nombre del Cliente:", key="cli_txt_domo")
         if cli_domo: 
             desc_pdf = f"Domo Geodésico/Evolutivo. Dimensiones Base: {ancho}m x {fondo}m. Altura Cumbrera: {data['geo']['h']:.2f}m."
-            st.download_button("PDF", generar_pdf_cotizacion(cli_domo, "Domo Ferrotek", data, desc_pdf), "cot.pdf")
+            st.download_button("PDF", pdf_cotizacion(cli_domo, "Domo Ferrotek", data, desc_pdf, "domo", {'ancho':ancho, 'fondo':fondo}, full), "cot.pdf")
+    with c1: calculadora_domo()
     with c2: 
-        st.success(f"Altura: {data['geo']['h']:.2f}m")
         try:
-            st.image("Loft_rural.png", use_container_width=True)
+            st.image(catalogo_imagenes.leer("Loft_rural.png"), use_container_width=True)
         except:
             pass
 
@@ -415,20 +328,150 @@ elif st.session_state.view == 'domos':
 elif st.session_state.view == 'agua':
     st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("💧 Línea Agua")
     c1, c2 = st.columns(2)
-    with c1:
+    @calculadora("agua")
+    def calculadora_agua():
         vol = st.slider("Litros:", 1000, 20000, 5000, 1000)
         data = calcular_proyecto({'vol': vol/1000}, "agua")
         st.metric("Precio", f"${data['precio']:,.0f}")
         mostrar_desglose(data)
+        mostrar_riesgo("agua", {'vol': vol/1000})
+        with st.expander("💰 ¿Qué construyo con mi presupuesto?"):
+            presupuesto = pedir_presupuesto("agua")
+            if presupuesto:
+                import solucionador
+                sol = solucionador.tanque(presupuesto, libro, st.session_state['margen'] / 100)
+                if sol: st.success(f"Hasta {sol['litros']:,} litros: ${sol['precio']:,.0f}")
+                else: st.warning("El presupuesto no alcanza para el tanque de 1.000 litros.")
         cli_agua = st.text_input("Nombre del Cliente:", key="cli_txt_agua")
         if cli_agua: 
             desc_pdf = f"Tanque de Almacenamiento. Capacidad: {vol} Litros. Sistema Monolítico Impermeable."
-            st.download_button("PDF", generar_pdf_cotizacion(cli_agua, "Tanque de Agua", data, desc_pdf), "cot.pdf")
+            st.download_button("PDF", pdf_cotizacion(cli_agua, "Tanque de Agua", data, desc_pdf, "agua", {'vol': vol/1000}), "cot.pdf")
+    with c1: calculadora_agua()
+
+# --- LISTA DE PRECIOS ---
+elif st.session_state.view == 'lista':
+    st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("📋 Lista de Precios del Catálogo")
+    if not es_admin: st.warning("Restringido"); st.stop()
+    import lista_precios
+    lista = lista_precios.obtener_lista(); margen = st.session_state['margen'] / 100
+    tabla = lista.tabla(libro, margen)
+    anteriores = [v['version'] for v in almacen.historial(20) if v['version'] != libro.version]
+    comparar = st.selectbox("Comparar con versión:", [None] + anteriores, index=1 if anteriores else 0,
+                            format_func=lambda v: "—" if v is None else f"v{v}")
+    st.caption(f"Lista de precios v{libro.version} · margen {st.session_state['margen']}%")
+    if comparar is not None:
+        previo = lista.precios(almacen.version(comparar), margen)
+        tabla[f"Precio v{comparar}"] = previo
+        tabla["Cambio %"] = (tabla["Precio"] / previo - 1) * 100
+        lista.costos(libro)  # deja la lista compilada en la versión vigente
+    st.dataframe(tabla, hide_index=True, use_container_width=True,
+                 column_config={c: st.column_config.NumberColumn(format="dollar") for c in tabla.columns if c.startswith("Precio")} |
+                               {"Cambio %": st.column_config.NumberColumn(format="%+.2f%%")})
+    st.caption(f"Repreciados: {lista.conteo['completos']} completos, {lista.conteo['incrementales']} incrementales")
+
+# --- COTIZACIÓN MASIVA ---
+elif st.session_state.view == 'masivo':
+    st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("📦 Cotización Masiva")
+    if not es_admin: st.warning("Restringido"); st.stop()
+    import io
+    import pandas as pd
+    import consolidacion
+    import cotizacion_masiva
+    archivo = st.file_uploader("Solicitudes (CSV): cliente, linea, ancho, fondo, ml, altura, tipo, area, estilo, litros, acabados", type="csv")
+    if archivo:
+        try:
+            solicitudes = cotizacion_masiva.leer_solicitudes(archivo)
+        except ValueError as e:
+            st.error(str(e)); st.stop()
+        P = libro; margen = st.session_state['margen'] / 100; sesion = st.session_state['sesion']
+        resumen, _ = cotizacion_masiva.cotizar_solicitudes(solicitudes, P, margen)
+        c1, c2 = st.columns(2)
+        c1.metric("Cotizaciones", len(resumen)); c2.metric("Total Cotizado", f"${resumen['Precio'].sum():,.0f}")
+        st.dataframe(resumen, hide_index=True, use_container_width=True)
+        def zip_cotizaciones():
+            # st.download_button carga la descarga completa en memoria: el ZIP por flujo
+            # (sin retenerlo entero) solo aplica a la línea de comandos y a zip_en_trozos
+            destino = io.BytesIO()
+            cotizacion_masiva.escribir_zip(destino, solicitudes, P, margen)
+            datos = destino.getvalue()
+            # Se registran como emitidas solo cuando el ZIP ya está armado
+            for fila, res in zip(solicitudes.itertuples(index=False), consolidacion.cotizar_obras(solicitudes, P, margen)):
+                registro.registrar(fila.linea, consolidacion.entrada(fila), bool(fila.acabados), res, margen, evento="emitida",
+                                   cliente=str(fila.cliente), sesion=sesion, origen="masivo")
+            return datos
+        st.download_button("⬇️ ZIP de Cotizaciones", zip_cotizaciones, "cotizaciones.zip", "application/zip")
+        with st.expander("📋 Pedido Consolidado y Cortes PGC"):
+            materiales, plan = consolidacion.consolidar(consolidacion.cotizar_obras(solicitudes, P, margen))
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Tubos PGC (6m)", plan['tubos'], f"mínimo {plan['minimo']}", delta_color="off")
+            c2.metric("Aprovechamiento", f"{plan['aprovechamiento']:.1%}"); c3.metric("Desperdicio", f"{plan['desperdicio_ml']:,.1f} ml")
+            st.dataframe(materiales.reset_index(), hide_index=True, use_container_width=True)
+            st.caption("Plan de cortes (mismas piezas por tubo)")
+            st.dataframe(pd.DataFrame(plan['patrones']), hide_index=True, use_container_width=True)
+
+# --- MÉTRICAS ---
+elif st.session_state.view == 'metricas':
+    st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("📈 Métricas de Rendimiento")
+    if not es_admin: st.warning("Restringido"); st.stop()
+    import pandas as pd
+    n_reruns = st.slider("Últimos reruns:", 10, metricas.HISTORIAL_MAX, 50)
+    registros = metricas.historial(n_reruns)
+    if not registros:
+        st.info("Sin datos. Active 'Medir rendimiento' en el panel de Gerencia y navegue la vitrina.")
+    else:
+        tabla = pd.DataFrame([{"Fecha": r['fecha'], "Vista": r['vista'], "total (ms)": r['total_ms'],
+                               **{f"{k} (ms)": v for k, v in r['tramos'].items()}, **r['contadores']} for r in registros])
+        tabla["Fecha"] = pd.to_datetime(tabla["Fecha"], unit='s')
+        cols_ms = [c for c in tabla.columns if c.endswith("(ms)")]
+        pct = tabla[cols_ms].quantile([0.5, 0.9, 0.99]).T
+        pct.columns = ["p50", "p90", "p99"]
+        st.markdown("##### Percentiles por Sección (ms)")
+        st.dataframe(pct.round(2), use_container_width=True)
+        st.markdown("##### Reruns")
+        st.dataframe(tabla.iloc[::-1].round(2), hide_index=True, use_container_width=True)
+        if st.button("💾 Exportar JSONL"):
+            st.success(f"{metricas.exportar_jsonl(n=n_reruns)} reruns agregados a {metricas.RUTA_EXPORTACION}")
+    descargas = metricas.descargas()
+    if descargas:
+        st.markdown("##### PDF Entregados (descargas diferidas, acumulado del proceso)")
+        st.dataframe(pd.DataFrame([{"Documento": k, "Descargas": d['descargas'], "PDF bytes": d['bytes'],
+                                    "ms promedio": d['ms'] / d['descargas'], "ms total": d['ms']} for k, d in descargas.items()]).round(2),
+                     hide_index=True, use_container_width=True)
 
 # --- FÁBRICA ---
 elif st.session_state.view == 'fabrica':
-    st.button("⬅️ Volver"); st.header("🏭 Fábrica")
+    st.button("⬅️ Volver", on_click=lambda: set_view('home')); st.header("🏭 Fábrica")
     if not es_admin: st.warning("Restringido"); st.stop()
-    tipo = st.selectbox("Mezcla:", ["Mezcla A", "Mezcla B", "Mezcla T"])
-    qty = st.number_input("Bultos:", 1); res = calcular_produccion_lote(tipo, qty)
-    st.table(pd.DataFrame(list(res.items()), columns=["Insumo", "Kg"]))
\ No newline at end of file
+    import pandas as pd
+    import motor_mezclas
+    tab_lote, tab_plan = st.tabs(["🧪 LOTE", "📅 PLAN DE PRODUCCIÓN"])
+    with tab_lote:
+        tipo = st.selectbox("Mezcla:", ["Mezcla A", "Mezcla B", "Mezcla T"])
+        qty = st.number_input("Bultos:", 1); res = motor_mezclas.calcular_produccion_lote(tipo, qty)
+        st.table(pd.DataFrame(list(res.items()), columns=["Insumo", "Kg"]))
+    with tab_plan:
+        archivo = st.file_uploader("Libro de pedidos (CSV): tipo, bultos, fecha", type="csv")
+        if archivo: pedidos = pd.read_csv(archivo)
+        else:
+            hoy = pd.Timestamp.today().normalize()
+            pedidos = st.data_editor(pd.DataFrame({"tipo": ["Mezcla A", "Mezcla B", "Mezcla T"], "bultos": [200, 150, 80],
+                                                   "fecha": [hoy, hoy + pd.Timedelta(days=3), hoy + pd.Timedelta(days=8)]}),
+                                     num_rows="dynamic", key="ed_pedidos", use_container_width=True)
+        # Celda vacía = insumo sin control de existencias; 0 kg es un stock real (agotado)
+        stock = st.data_editor(pd.DataFrame({"Kg": [None] * len(motor_mezclas.INSUMOS)}, index=motor_mezclas.INSUMOS, dtype=float),
+                               key="ed_stock", column_config={"Kg": st.column_config.NumberColumn(
+                                   "Stock (kg)", min_value=0.0, help="Vacío: no se controla. 0: sin existencias")})
+        faltan = {'tipo', 'bultos', 'fecha'} - set(pedidos.columns)
+        if faltan: st.error(f"Faltan columnas: {', '.join(sorted(faltan))}"); st.stop()
+        plan = motor_mezclas.planificar_produccion(pedidos.dropna(subset=['tipo', 'bultos', 'fecha']),
+                                                   stock["Kg"].dropna().to_dict())
+        c1, c2 = st.columns(2)
+        c1.metric("Lotes", f"{len(plan['lotes']):,}"); c2.metric("Bultos", f"{plan['lotes']['bultos'].sum():,.0f}")
+        for insumo, f in plan['faltantes'].items():
+            st.error(f"Faltante de {insumo}: {f['kg']:,.0f} kg (desde {f['fecha']:%d/%m/%Y})")
+        st.markdown("##### Consumo Semanal (kg)")
+        st.dataframe(plan['semanal'].round(1), use_container_width=True)
+        with st.expander("Consumo Diario (kg)"):
+            st.dataframe(plan['diario'].round(1), use_container_width=True)
+
+metricas.cerrar_rerun(st.session_state.view)
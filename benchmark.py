@@ -0,0 +1,255 @@
+import argparse
+import ast
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime
+import numpy as np
+import metricas
+import motor_costos
+import motor_lotes
+import riesgo_precios
+from core_planos import PRECIOS_CORE, CoreFerrotek
+from documentos_pdf import generar_pdf_cotizacion, generar_portafolio
+from motor_mezclas import calcular_produccion_lote
+from prueba_carga import aislar_datos
+
+# ==========================================
+# BENCHMARKS (SIN RED)
+# ==========================================
+#   python benchmark.py                          -> mide y guarda benchmark.json
+#   python benchmark.py --comparar base.json     -> marca regresiones (código de salida 1)
+#   python benchmark.py --solo pdf --rapido
+#   python benchmark.py --solo arranque          -> arranque en frío vs PRESUPUESTO_ARRANQUE (código de salida 1)
+# Cada caso reporta mediana/p95/mínimo en ms; los de lote agregan filas/s y
+# los PDF el tamaño en bytes. Las comparaciones usan la mediana.
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_vitrina.py")
+# Presupuesto fijo de arranque (ms, mediana): el servidor se reinicia seguido y el
+# primer visitante paga los imports. El home tampoco debe cargar estos módulos.
+PRESUPUESTO_ARRANQUE = {"arranque/importar": 600, "arranque/primer_render": 900}
+PESADOS = ("pandas", "numpy", "fpdf", "PIL", "pyarrow")
+
+ENTRADAS = {
+    "domo": {'ancho': 6.0, 'fondo': 10.0},
+    "muro": {'ml': 25.0, 'altura': 2.2, 'tipo': "Tipo 1 (Doble)"},
+    "casa": {'area': 48, 'estilo': 'Tradicional'},
+    "agua": {'vol': 5.0},
+}
+
+def resumir(tiempos):
+    tiempos = sorted(tiempos)
+    return {"mediana_ms": statistics.median(tiempos), "p95_ms": tiempos[int(0.95 * (len(tiempos) - 1))],
+            "min_ms": tiempos[0], "n": len(tiempos)}
+
+def medir(fn, repeticiones=50, minimo_s=0.2):
+    """Corre fn al menos `repeticiones` veces y `minimo_s` segundos; tiempos en ms"""
+    fn()  # calentamiento
+    tiempos = []
+    inicio = time.perf_counter()
+    while len(tiempos) < repeticiones or time.perf_counter() - inicio < minimo_s:
+        t0 = time.perf_counter(); fn(); tiempos.append((time.perf_counter() - t0) * 1000)
+        if len(tiempos) >= 100_000: break
+    return resumir(tiempos)
+
+def _lote(fn, filas, **kw):
+    r = medir(fn, **kw)
+    r["filas"] = filas; r["filas_por_s"] = filas / (r["mediana_ms"] / 1000)
+    return r
+
+# ==========================================
+# CASOS
+# ==========================================
+def casos_cotizacion(rep):
+    libro = motor_costos.LIBRO_BASE
+    for linea, entrada in ENTRADAS.items():
+        yield f"cotizacion/{linea}", lambda: medir(lambda: motor_costos.calcular_proyecto(entrada, linea, True, libro, 0.3), rep)
+    yield "cotizacion/domo_cacheada", lambda: medir(
+        lambda: motor_costos.calcular_proyecto_cacheado(ENTRADAS["domo"], "domo", True, libro, 0.3), rep)
+
+def casos_core(rep):
+    core = CoreFerrotek(PRECIOS_CORE, 0.3)
+    yield "core/muro_perimetral", lambda: medir(lambda: core.calcular_muro_perimetral(40.0), rep)
+    yield "core/vivienda_unibody", lambda: medir(lambda: core.calcular_vivienda_unibody(60.0), rep)
+    yield "core/boveda_v58", lambda: medir(lambda: core.calcular_boveda_v58(12.0), rep)
+
+def casos_mezclas(rep):
+    for tipo in ("Mezcla A", "Mezcla B", "Mezcla T"):
+        yield f"mezclas/{tipo[-1]}", lambda: medir(lambda: calcular_produccion_lote(tipo, 40), rep)
+
+def casos_lotes(rep):
+    P = motor_costos.PRECIOS_BASE
+    A, F = np.meshgrid(motor_lotes.rango(2.0, 15.0), motor_lotes.rango(3.0, 50.0), indexing='ij')
+    A = A.ravel(); F = F.ravel()
+    reps = max(3, rep // 10)
+    yield "lotes/domos_vectorizado", lambda: _lote(lambda: motor_lotes.cotizar_domos(A, F, P, 0.3), len(A), repeticiones=reps)
+    muestra = list(zip(A[::30].tolist(), F[::30].tolist()))
+    libro = motor_costos.LIBRO_BASE
+    yield "lotes/domos_escalar", lambda: _lote(
+        lambda: [motor_costos.calcular_proyecto({'ancho': a, 'fondo': f}, "domo", True, libro, 0.3) for a, f in muestra],
+        len(muestra), repeticiones=reps)
+    yield "lotes/tabla_muros", lambda: _lote(lambda: motor_lotes.tabla_muros(P, 0.3), 2 * 991, repeticiones=reps)
+
+def casos_riesgo(rep):
+    libro = motor_costos.LIBRO_BASE
+    reps = max(3, rep // 10)
+    for linea in ("domo", "casa"):
+        yield f"riesgo/{linea}_100k", lambda: _lote(
+            lambda: riesgo_precios.simular(linea, ENTRADAS[linea], libro, 0.3, n=100_000), 100_000, repeticiones=reps)
+
+def casos_pdf(rep):
+    datos = motor_costos.calcular_proyecto(ENTRADAS["domo"], "domo")
+    desc = "Domo Geodésico/Evolutivo. Dimensiones Base: 6.0m x 10.0m. Altura Cumbrera: 3.80m."
+    reps = max(5, rep // 5)
+    def pdf_caso(fn):
+        r = medir(fn, repeticiones=reps); r["bytes"] = len(fn()); return r
+    yield "pdf/cotizacion", lambda: pdf_caso(lambda: generar_pdf_cotizacion("Cliente Benchmark", "Domo Ferrotek", datos, desc))
+    for tipo in ("master", "casas", "guia"):
+        yield f"pdf/portafolio_{tipo}", lambda: pdf_caso(lambda: generar_portafolio(tipo))
+
+def casos_app(rep):
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    warnings.simplefilter("ignore")
+    aislar_datos()
+    def preparar(vista):
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.run()
+        at.session_state.view = vista
+        at.run()
+        return at
+    reps = max(3, rep // 10)
+    for vista in ("home", "domos", "casas"):
+        yield f"app/rerun_{vista}", lambda: medir(preparar(vista).run, repeticiones=reps, minimo_s=0)
+    # Cambio de un number_input de la calculadora. AppTest siempre reejecuta el script
+    # completo (el costo sin fragmentos); un rerun parcial reejecuta solo el tramo
+    # "calculadora" que metricas registra dentro de ese mismo rerun.
+    medidas = {}
+    def interaccion(vista, indice, valores):
+        if vista in medidas: return medidas[vista]
+        at = preparar(vista); fragmento = []
+        def cambiar():
+            widget = at.number_input[indice]
+            widget.set_value(valores[widget.value == valores[0]]).run()
+            fragmento.append(metricas.historial(1)[-1]["tramos"]["calculadora"])
+        activo = metricas.activo(); metricas.activar(True)
+        try:
+            completo = medir(cambiar, repeticiones=reps, minimo_s=0)
+        finally:
+            metricas.activar(activo)
+        medidas[vista] = (completo, resumir(fragmento[1:]))
+        return medidas[vista]
+    for vista, indice, valores in (("domos", 1, (10.0, 12.0)), ("muros", 0, (10.0, 25.0))):
+        yield f"app/interaccion_{vista}", lambda: interaccion(vista, indice, valores)[0]
+        yield f"app/fragmento_{vista}", lambda: interaccion(vista, indice, valores)[1]
+
+# Cada medición corre en un intérprete nuevo, como tras un reinicio. importar: los
+# imports de nivel superior de app_vitrina; primer_render: primera ejecución del
+# home con AppTest (imports de la app + render), sin contar el import de streamlit.
+_IMPORTAR = """import json, sys, time
+t0 = time.perf_counter()
+{imports}
+print(json.dumps({{"ms": (time.perf_counter() - t0) * 1000, "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+_PRIMER_RENDER = """import json, logging, sys, time, warnings
+warnings.simplefilter("ignore")
+from streamlit.testing.v1 import AppTest
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+t0 = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120); at.run()
+print(json.dumps({{"ms": (time.perf_counter() - t0) * 1000, "errores": len(at.exception),
+                  "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+def _imports_app():
+    with open(APP, encoding="utf-8") as f: arbol = ast.parse(f.read())
+    return "\n".join(ast.unparse(n) for n in arbol.body if isinstance(n, (ast.Import, ast.ImportFrom)))
+
+def _en_frio(codigo, n):
+    tiempos = []; pesados = set()
+    for _ in range(n):
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=os.path.dirname(APP),
+                                capture_output=True, text=True, check=True)
+        r = json.loads(salida.stdout.strip().splitlines()[-1])
+        if r.get("errores"): raise RuntimeError(f"La app falló en el primer render: {salida.stderr[-500:]}")
+        tiempos.append(r["ms"]); pesados.update(r["pesados"])
+    r = resumir(tiempos); r["pesados"] = sorted(pesados)
+    return r
+
+def casos_arranque(rep):
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        return
+    aislar_datos()  # los subprocesos heredan las rutas temporales
+    reps = max(3, rep // 10)
+    yield "arranque/importar", lambda: _en_frio(_IMPORTAR.format(imports=_imports_app(), pesados=PESADOS), reps)
+    yield "arranque/primer_render", lambda: _en_frio(_PRIMER_RENDER.format(app=APP, pesados=PESADOS), reps)
+
+def verificar_arranque(actual, presupuesto=PRESUPUESTO_ARRANQUE):
+    """Casos de arranque que exceden su presupuesto o que cargaron módulos pesados"""
+    fallas = []
+    for nombre, limite in presupuesto.items():
+        r = actual["resultados"].get(nombre)
+        if r is None: continue
+        if r["mediana_ms"] > limite: fallas.append(f"{nombre}: {r['mediana_ms']:.0f} ms > {limite} ms")
+        if r["pesados"]: fallas.append(f"{nombre}: carga {', '.join(r['pesados'])}")
+    return fallas
+
+GRUPOS = {"cotizacion": casos_cotizacion, "core": casos_core, "mezclas": casos_mezclas,
+          "lotes": casos_lotes, "riesgo": casos_riesgo, "pdf": casos_pdf, "app": casos_app,
+          "arranque": casos_arranque}
+
+def ejecutar(solo=None, repeticiones=50):
+    resultados = {}
+    for grupo, casos in GRUPOS.items():
+        if solo and not any(grupo.startswith(s) or s.startswith(grupo) for s in solo): continue
+        for nombre, correr in casos(repeticiones):
+            if solo and not any(nombre.startswith(s) for s in solo): continue
+            resultados[nombre] = correr()
+            print(f"{nombre:<28} {resultados[nombre]['mediana_ms']:>10.3f} ms", file=sys.stderr)
+    return {"fecha": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "plataforma": platform.platform(), "resultados": resultados}
+
+def comparar(actual, base, umbral=0.25):
+    """Casos cuya mediana empeoró más que `umbral` (fracción) frente a la base"""
+    regresiones = []
+    for nombre, r in actual["resultados"].items():
+        previo = base.get("resultados", {}).get(nombre)
+        if not previo: continue
+        cambio = r["mediana_ms"] / previo["mediana_ms"] - 1
+        if cambio > umbral: regresiones.append((nombre, previo["mediana_ms"], r["mediana_ms"], cambio))
+    return regresiones
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks Ferrotek")
+    ap.add_argument("--salida", default="benchmark.json")
+    ap.add_argument("--comparar", help="JSON de una corrida anterior")
+    ap.add_argument("--umbral", type=float, default=0.25, help="Empeoramiento tolerado (0.25 = 25%%)")
+    ap.add_argument("--solo", nargs="*", help="Prefijos de casos: cotizacion, core, lotes/domos, pdf, app, arranque...")
+    ap.add_argument("--rapido", action="store_true", help="Menos repeticiones")
+    args = ap.parse_args(argv)
+
+    actual = ejecutar(args.solo, 10 if args.rapido else 50)
+    with open(args.salida, "w", encoding="utf-8") as f: json.dump(actual, f, indent=2)
+    print(f"Resultados en {args.salida}", file=sys.stderr)
+    fallas = verificar_arranque(actual)
+    for falla in fallas: print(f"PRESUPUESTO DE ARRANQUE {falla}", file=sys.stderr)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f: base = json.load(f)
+        regresiones = comparar(actual, base, args.umbral)
+        for nombre, antes, ahora, cambio in regresiones:
+            print(f"REGRESIÓN {nombre}: {antes:.3f} -> {ahora:.3f} ms (+{cambio:.0%})", file=sys.stderr)
+        if regresiones: return 1
+    return 1 if fallas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# CACHE LRU COMPARTIDO (TODAS LAS SESIONES)
+# ==========================================
+# Vive a nivel de módulo: Streamlit importa los módulos una sola vez por
+# proceso, así que todas las sesiones (hilos) ven la misma instancia.
+
+class CacheLRU:
+    def __init__(self, capacidad=128):
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor guardado o lo calcula, guarda y expulsa el menos usado"""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+        valor = calcular()
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+        return valor
+
+    def __contains__(self, clave):
+        with self._lock: return clave in self._datos
+
+    def __len__(self):
+        with self._lock: return len(self._datos)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear(); self.aciertos = 0; self.fallos = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {"aciertos": self.aciertos, "fallos": self.fallos,
+                    "entradas": len(self._datos), "capacidad": self.capacidad}
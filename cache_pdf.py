@@ -0,0 +1,79 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import date
+from cache_lru import CacheLRU
+
+# ==========================================
+# CACHE DE DOCUMENTOS PDF (PORTAFOLIOS)
+# ==========================================
+# Los portafolios no dependen del cliente ni de los precios: su contenido
+# queda determinado por el tipo de documento y la versión de la plantilla.
+# Subir VERSION_PLANTILLA al cambiar los textos invalida todo lo guardado.
+VERSION_PLANTILLA = "V124"
+
+_cache = CacheLRU(capacidad=16)
+_tiempos = {"frio_ms": [], "caliente_ms": []}
+_log = logging.getLogger("ferrotek.pdf")
+
+def clave_documento(tipo, version=VERSION_PLANTILLA):
+    return hashlib.sha256(f"{tipo}|{version}".encode()).hexdigest()
+
+def obtener_pdf(tipo, generador, version=VERSION_PLANTILLA):
+    """Bytes del documento; generador(tipo) solo corre si no está en cache"""
+    clave = clave_documento(tipo, version)
+    renderizado = []
+    def _render():
+        t0 = time.perf_counter()
+        pdf = generador(tipo)
+        renderizado.append((time.perf_counter() - t0) * 1000)
+        return pdf
+    t0 = time.perf_counter()
+    pdf = _cache.obtener(clave, _render)
+    if renderizado: _tiempos["frio_ms"].append(renderizado[0])
+    else: _tiempos["caliente_ms"].append((time.perf_counter() - t0) * 1000)
+    for serie in _tiempos.values(): del serie[:-100]
+    return pdf
+
+def estadisticas():
+    est = _cache.estadisticas()
+    for nombre, serie in _tiempos.items():
+        est[nombre] = sum(serie) / len(serie) if serie else None
+    return est
+
+def limpiar():
+    _cache.limpiar(); _cotizaciones.limpiar()
+    with _lock: _renders.update(renders=0, render_ms=0.0)
+    for serie in _tiempos.values(): serie.clear()
+
+# ==========================================
+# COTIZACIONES (RENDER DIFERIDO)
+# ==========================================
+# La vitrina entrega a st.download_button una función en vez de bytes: el PDF
+# solo se genera cuando alguien pulsa Descargar. Los clics repetidos sobre la
+# misma cotización salen de este cache. Cada render queda en el log
+# "ferrotek.pdf" y en los contadores, para comparar renders contra reruns.
+_cotizaciones = CacheLRU(capacidad=64)
+_renders = {"renders": 0, "render_ms": 0.0}
+_lock = threading.Lock()
+
+def clave_cotizacion(cliente, proyecto, datos, desc, version=VERSION_PLANTILLA, dia=None):
+    # El PDF imprime la fecha de emisión (y la validez corre desde ahí): otro día, otro documento
+    dia = dia or date.today().isoformat()
+    partes = (cliente, proyecto, f"{datos['precio']:.2f}", datos.get('nota', ''), desc, datos.get('version_precios'), version, dia)
+    return hashlib.sha256("|".join(map(str, partes)).encode()).hexdigest()
+
+def obtener_cotizacion(cliente, proyecto, datos, desc, generador):
+    """Bytes del PDF de la cotización; generador(cliente, proyecto, datos, desc) solo corre si no está en cache"""
+    def _render():
+        t0 = time.perf_counter()
+        pdf = generador(cliente, proyecto, datos, desc)
+        ms = (time.perf_counter() - t0) * 1000
+        with _lock: _renders["renders"] += 1; _renders["render_ms"] += ms
+        _log.info("PDF cotización: %s / %s, %d bytes en %.1f ms", cliente, proyecto, len(pdf), ms)
+        return pdf
+    return _cotizaciones.obtener(clave_cotizacion(cliente, proyecto, datos, desc), _render)
+
+def estadisticas_cotizaciones():
+    with _lock: return {**_cotizaciones.estadisticas(), **_renders}
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+from cache_lru import CacheLRU
+
+# ==========================================
+# CATÁLOGO DE IMÁGENES (GALERÍA)
+# ==========================================
+# Índice persistente (nombre, mtime, tamaño, leyenda) + miniaturas en disco.
+# Una miniatura solo se regenera cuando cambia el archivo fuente; la imagen
+# original se entrega únicamente cuando alguien la pide.
+EXTENSIONES = ('.png', '.jpg', '.jpeg')
+CARPETA_CACHE = os.path.join('.cache', 'galeria')
+ANCHOS = (360,)  # la galería solo muestra miniaturas de 360 px; 'Ver original' entrega el archivo
+CALIDAD_JPEG = 80
+TTL_INDICE = 30  # segundos entre re-escaneos de la carpeta
+MAX_BYTES_COMPARTIDOS = 8 * 1024 * 1024  # originales más grandes se leen sin guardarlos
+
+_lock = threading.Lock()
+_estado = {"carpeta": None, "leido": 0.0, "indice": {}}
+_bytes = CacheLRU(capacidad=64)
+
+def leyenda(nombre):
+    return nombre.split('.')[0].replace('_', ' ').title()
+
+def _ruta_indice(cache):
+    return os.path.join(cache, 'indice.json')
+
+def ruta_miniatura(nombre, ancho, cache=CARPETA_CACHE):
+    # Con la extensión: render.jpg y render.png no comparten miniatura
+    return os.path.join(cache, f"{nombre}_{ancho}.jpg")
+
+def _generar_miniaturas(ruta, nombre, cache):
+    from PIL import Image  # solo al crear miniaturas; leer() y el índice no lo necesitan
+    with Image.open(ruta) as img:
+        img = img.convert('RGB')
+        for ancho in ANCHOS:
+            mini = img.copy()
+            mini.thumbnail((ancho, ancho * 10))
+            mini.save(ruta_miniatura(nombre, ancho, cache), 'JPEG', quality=CALIDAD_JPEG, optimize=True, progressive=True)
+
+def _cargar_indice(cache):
+    try:
+        with open(_ruta_indice(cache), encoding='utf-8') as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def actualizar_indice(carpeta='.', cache=CARPETA_CACHE):
+    """Escanea la carpeta, regenera solo las miniaturas de archivos nuevos o modificados"""
+    os.makedirs(cache, exist_ok=True)
+    previo = _cargar_indice(cache)
+    indice = {}
+    with os.scandir(carpeta) as it:
+        for e in it:
+            if not (e.is_file() and e.name.lower().endswith(EXTENSIONES)): continue
+            info = e.stat()
+            item = {"nombre": e.name, "mtime": info.st_mtime, "bytes": info.st_size, "leyenda": leyenda(e.name)}
+            viejo = previo.get(e.name)
+            vigente = viejo and viejo["mtime"] == item["mtime"] and viejo["bytes"] == item["bytes"]
+            if not (vigente and all(os.path.exists(ruta_miniatura(e.name, a, cache)) for a in ANCHOS)):
+                try:
+                    _generar_miniaturas(e.path, e.name, cache)
+                except OSError:
+                    continue  # archivo dañado o no legible: no entra en la galería
+            indice[e.name] = item
+    # Miniaturas sin imagen vigente (borradas, o de otro nombre/ancho en versiones anteriores)
+    vigentes = {os.path.basename(ruta_miniatura(n, a, cache)) for n in indice for a in ANCHOS}
+    with os.scandir(cache) as it:
+        for e in it:
+            if e.name.endswith('.jpg') and e.name not in vigentes:
+                try: os.remove(e.path)
+                except OSError: pass
+    tmp = _ruta_indice(cache) + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f: json.dump(indice, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, _ruta_indice(cache))
+    return indice
+
+def catalogo(carpeta='.', cache=CARPETA_CACHE):
+    """Lista ordenada del índice; se re-escanea como máximo cada TTL_INDICE segundos"""
+    with _lock:
+        ahora = time.monotonic()
+        if _estado["carpeta"] != (carpeta, cache) or ahora - _estado["leido"] > TTL_INDICE:
+            _estado["indice"] = actualizar_indice(carpeta, cache)
+            _estado["carpeta"] = (carpeta, cache); _estado["leido"] = ahora
+        return sorted(_estado["indice"].values(), key=lambda i: i["nombre"])
+
+def leer(ruta):
+    """Bytes de la imagen, compartidos por todas las sesiones mientras el archivo no cambie"""
+    info = os.stat(ruta)
+    def _leer():
+        with open(ruta, 'rb') as f: return f.read()
+    if info.st_size > MAX_BYTES_COMPARTIDOS: return _leer()
+    return _bytes.obtener((os.path.abspath(ruta), info.st_mtime_ns, info.st_size), _leer)
+
+def estadisticas():
+    return _bytes.estadisticas()
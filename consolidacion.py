@@ -0,0 +1,122 @@
+import argparse
+import bisect
+import sys
+from collections import Counter
+import numpy as np
+import pandas as pd
+import motor_costos
+from motor_costos import PRECIOS_BASE
+
+# ==========================================
+# CONSOLIDADO DE MATERIALES Y CORTES PGC
+# ==========================================
+# Cada cotización redondea sus insumos a unidades completas, así que sumar
+# cotizaciones compra de más. Aquí se suman las cantidades exactas de todas las
+# obras (res["exactos"]) agrupando por Insumo/Unid y se redondea una sola vez.
+# El perfil PGC no se pide por metro: las piezas de cada obra (res["despiece_pgc"])
+# se empacan en tubos de 6 m (mejor ajuste decreciente, O(n log n)).
+LARGO_TUBO = 6.0
+CORTE = 0.003  # ancho del disco por corte (m)
+PERFIL = "Perfil PGC 90x40 Cal.22 (6m)"
+# Mismo producto con otro nombre según la línea
+ALIAS = {"Perfil Estructural PGC 90x40 Cal.22 (6m)": PERFIL, "Perfil PGC 90x40 Cal.22 (Parales)": PERFIL,
+         "Perfil PGC 90x40 Cal.22 (Total)": PERFIL,
+         "Tornillería Extraplana (Wafer)": "Tornillería Wafer/Extraplanos",
+         "Tornillería Estructura (Wafer)": "Tornillería Wafer/Extraplanos"}
+
+def piezas(despiece):
+    """[(largo, ml)] -> largos de pieza (la última de cada tramo lleva el sobrante)"""
+    largos = []
+    for largo, ml in despiece:
+        n, resto = divmod(round(ml, 6), largo)
+        largos += [largo] * int(n) + ([resto] if resto > 1e-6 else [])
+    return largos
+
+def optimizar_cortes(largos, largo_tubo=LARGO_TUBO, corte=CORTE):
+    """Empaca piezas en tubos: mejor ajuste decreciente sobre los sobrantes ordenados
+
+    >>> optimizar_cortes([3.0, 3.0])["tubos"], optimizar_cortes([3.0, 3.01])["tubos"]
+    (1, 2)
+    """
+    largos = np.round(np.asarray(largos, dtype=float), 3)
+    largos = largos[largos > 0]
+    # Piezas más largas que el tubo: tubos enteros empalmados + el sobrante como pieza
+    enteros = np.floor(largos / largo_tubo + 1e-9)
+    resto = np.round(largos - enteros * largo_tubo, 3)
+    orden = np.sort(resto[resto > 0])[::-1]
+    # El disco corta solo entre piezas: cada tubo arranca con un corte de crédito
+    # (la última pieza no lo gasta) y cada pieza descuenta su largo más un corte
+    sobrantes = []  # (sobrante + corte, tubo) ordenado
+    tubos = []
+    for largo in orden.tolist():
+        i = bisect.bisect_left(sobrantes, (largo - 1e-9, -1))
+        if i == len(sobrantes):
+            tubos.append([largo]); t = len(tubos) - 1; libre = largo_tubo + corte
+        else:
+            libre, t = sobrantes.pop(i); tubos[t].append(largo)
+        libre = round(libre - largo - corte, 6)
+        if libre > 1e-9: bisect.insort(sobrantes, (libre, t))
+    n_enteros = int(enteros.sum())
+    total = n_enteros + len(tubos)
+    ml = float(largos.sum())
+    patrones = Counter(tuple(p) for p in tubos)
+    return {"tubos": total, "piezas": len(orden) + n_enteros, "ml": ml,
+            "minimo": int(np.ceil(ml / largo_tubo - 1e-9)), "desperdicio_ml": total * largo_tubo - ml,
+            "aprovechamiento": ml / (total * largo_tubo) if total else 1.0,
+            "patrones": ([{"Cortes": f"{largo_tubo:g}", "Tubos": n_enteros, "Sobrante (m)": 0.0}] if n_enteros else []) +
+                        [{"Cortes": " + ".join(f"{x:g}" for x in p), "Tubos": n,
+                          "Sobrante (m)": round(max(largo_tubo - sum(p) - corte * (len(p) - 1), 0.0), 3)} for p, n in patrones.most_common()]}
+
+def consolidar(cotizaciones, largo_tubo=LARGO_TUBO, corte=CORTE):
+    """Pedido único para varias cotizaciones de calcular_proyecto -> (materiales, plan de cortes)"""
+    filas = []; despiece = []
+    for obra, res in enumerate(cotizaciones):
+        exactos = res.get("exactos", {})
+        for m in res.get("materiales", []):
+            filas.append((ALIAS.get(m["Insumo"], m["Insumo"]), m["Unid"], obra, m["Cant"],
+                          exactos.get(m["Insumo"], m["Cant"]), m["Costo"]))
+        despiece += res.get("despiece_pgc", [])
+    df = pd.DataFrame(filas, columns=["Insumo", "Unid", "Obra", "Cant", "Exacto", "Costo"]).set_index(["Insumo", "Unid"])
+    g = df.groupby(level=["Insumo", "Unid"]).agg(Obras=("Obra", "nunique"), Por_obra=("Cant", "sum"),
+                                                Exacto=("Exacto", "sum"), Costo=("Costo", "sum"))
+    g["Consolidado"] = np.ceil(g["Exacto"].round(6))
+    plan = optimizar_cortes(piezas(despiece), largo_tubo, corte)
+    perfil = g.index.get_level_values("Insumo") == PERFIL
+    if perfil.any(): g.loc[perfil, "Consolidado"] = plan["tubos"]
+    unitario = (g["Costo"] / g["Por_obra"]).where(g["Por_obra"] > 0, 0.0)
+    g["Ahorro"] = g["Por_obra"] - g["Consolidado"]
+    g["Costo consolidado"] = g["Consolidado"] * unitario
+    g = g.rename(columns={"Por_obra": "Suma por obra", "Costo": "Costo por obra"})
+    return g[["Obras", "Suma por obra", "Exacto", "Consolidado", "Ahorro", "Costo por obra", "Costo consolidado"]], plan
+
+def entrada(fila):
+    """input_data de calcular_proyecto para una fila de leer_solicitudes"""
+    if fila.linea == "domo": return {'ancho': float(fila.ancho), 'fondo': float(fila.fondo)}
+    if fila.linea == "muro": return {'ml': float(fila.ml), 'altura': float(fila.altura), 'tipo': str(fila.tipo)}
+    if fila.linea == "casa": return {'area': float(fila.area), 'estilo': str(fila.estilo)}
+    return {'vol': float(fila.litros) / 1000}
+
+def cotizar_obras(df, precios, margen):
+    """Cotización de cada fila de cotizacion_masiva.leer_solicitudes"""
+    # Sin CACHE_COTIZACIONES: cientos de obras de una sola vez desalojarían las de las calculadoras
+    return [motor_costos.calcular_proyecto(entrada(f), f.linea, bool(f.acabados), precios, margen)
+            for f in df.itertuples(index=False)]
+
+# ==========================================
+# LÍNEA DE COMANDOS
+# ==========================================
+def main(argv=None):
+    from cotizacion_masiva import leer_solicitudes
+    ap = argparse.ArgumentParser(description="Pedido consolidado de materiales y plan de cortes PGC")
+    ap.add_argument("obras", help="CSV de obras activas (mismo formato que cotizacion_masiva)")
+    ap.add_argument("--corte", type=float, default=CORTE, help="Ancho del disco en metros")
+    args = ap.parse_args(argv)
+    materiales, plan = consolidar(cotizar_obras(leer_solicitudes(args.obras), motor_costos.PriceBook(PRECIOS_BASE), 0.3),
+                                  corte=args.corte)
+    print(materiales.to_string(float_format=lambda v: f"{v:,.2f}"))
+    print(f"\nTubos PGC: {plan['tubos']} (mínimo teórico {plan['minimo']}), "
+          f"aprovechamiento {plan['aprovechamiento']:.1%}", file=sys.stderr)
+    print(pd.DataFrame(plan["patrones"]).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
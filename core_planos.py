@@ -1,5 +1,13 @@
 import math
 
+# Lista de referencia (claves propias del sistema Raíz / Unibody / Bóveda)
+PRECIOS_CORE = {'perfil_2_pulg_mt': 12000, 'malla_5mm_m2': 28000, 'malla_zaranda_m2': 6000,
+    'cemento_bulto': 29500, 'cal_bulto': 25000, 'arena_m3': 98000, 'valor_jornal': 90000,
+    'aditivo_F1_kg': 15000, 'sellado_FX_galon': 85000}
+# Insumos que CoreFerrotek comparte con la lista de la vitrina (clave Core -> clave vitrina)
+EQUIVALENCIAS_CORE = {'cemento_bulto': 'cemento_gris_50kg', 'cal_bulto': 'cal_hidratada_25kg',
+                      'arena_m3': 'arena_rio_m3', 'malla_5mm_m2': 'malla_5mm_m2'}
+
 class CoreFerrotek:
     def __init__(self, precios, margen_utilidad):
         self.p = precios
@@ -9,16 +17,24 @@ class CoreFerrotek:
 
     def calcular_muro_perimetral(self, ml):
         """Muro 2.20m - Sistema Raíz con Zapata Continua"""
+        return round(self.costo_muro_perimetral(ml) / self.MARGEN, -3)
+
+    def costo_muro_perimetral(self, ml):
+        """Costo directo del muro (sin margen ni redondeo)"""
         cant_postes = math.ceil(ml / 1.5) + 1
         acero = (cant_postes * 2.8 * self.p['perfil_2_pulg_mt']) + (ml * 3 * 8500)
         area = ml * self.H_MALLA
         mallas = (area * self.p['malla_5mm_m2']) + (area * 2 * self.p['malla_zaranda_m2'])
         mezcla = (ml * self.H_VISTA * 0.04 * 1.1) * (5*self.p['cemento_bulto'] + 5*self.p['cal_bulto'] + self.p['arena_m3'])
         costo_dir = acero + mallas + mezcla + (ml * 0.85 * self.p['valor_jornal'])
-        return round(costo_dir / self.MARGEN, -3)
+        return costo_dir
 
     def calcular_vivienda_unibody(self, area_m2):
         """Casas: Fachada Doble / Internos Simple (Matriz 1:3:3)"""
+        return round(self.costo_vivienda_unibody(area_m2) / self.MARGEN, -3)
+
+    def costo_vivienda_unibody(self, area_m2):
+        """Costo directo de la vivienda (sin margen ni redondeo)"""
         perim = math.sqrt(area_m2) * 4
         div_int = perim * 0.6
         area_ext = perim * 2.4
@@ -30,10 +46,14 @@ class CoreFerrotek:
         estructura = (perim + div_int) * 1.5 * self.p['perfil_2_pulg_mt']
         techo = area_m2 * 85000 
         costo_dir = mallas_ext + mallas_int + mezcla_muros + pisos_tech + estructura + techo + (area_m2 * 2.8 * self.p['valor_jornal'])
-        return round(costo_dir / self.MARGEN, -3)
+        return costo_dir
 
     def calcular_boveda_v58(self, largo_m):
         """Bóveda Ferrotek: Base Perfil C18 + Arcos de Varilla (3.80m x 2.40m)"""
+        return round(self.costo_boveda_v58(largo_m) / self.MARGEN, -3)
+
+    def costo_boveda_v58(self, largo_m):
+        """Costo directo de la bóveda (sin margen ni redondeo)"""
         ancho = 3.80
         altura = 2.40
         area_suelo = ancho * largo_m
@@ -53,4 +73,4 @@ class CoreFerrotek:
         mezcla = area_curva * 0.045 * (5*self.p['cemento_bulto'] + 5*self.p['cal_bulto'] + self.p['arena_m3'])
         
         costo_dir = costo_perfil_c + acero_arcos + mallas + mezcla + (20 * self.p['valor_jornal'])
-        return round(costo_dir / self.MARGEN, -3)
\ No newline at end of file
+        return costo_dir
\ No newline at end of file
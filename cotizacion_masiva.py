@@ -0,0 +1,156 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import motor_lotes
+from motor_costos import NOTAS, PRECIOS_BASE
+from documentos_pdf import generar_pdf_cotizacion
+
+# ==========================================
+# COTIZACIÓN MASIVA (FERIAS / LEADS)
+# ==========================================
+# Entrada: CSV o DataFrame con una fila por cliente.
+#   cliente, linea (domo|muro|casa|agua) y las mismas claves de calcular_proyecto:
+#   domo -> ancho, fondo | muro -> ml, altura, tipo | casa -> area, estilo | agua -> litros
+#   acabados (opcional, por defecto True)
+# Salida: ZIP con un PDF por fila + resumen.csv, escrito a medida que llegan los PDFs.
+DEFECTOS = {'altura': 2.2, 'tipo': 'Tipo 2 (Sencillo)', 'estilo': 'Tradicional', 'acabados': True}
+REQUERIDAS = {'domo': ('ancho', 'fondo'), 'muro': ('ml',), 'casa': ('area',), 'agua': ('litros',)}
+MIN_FILAS_POOL = 8  # por debajo, arrancar procesos cuesta más que renderizar en línea
+
+def _si_no(valor):
+    # Una columna 0/1 con celdas vacías llega como float (0.0): los números van por su valor
+    try: return float(valor) != 0
+    except (TypeError, ValueError): return str(valor).strip().lower() not in ('0', 'false', 'no', 'n')
+
+def leer_solicitudes(origen):
+    df = origen.copy() if isinstance(origen, pd.DataFrame) else pd.read_csv(origen)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    faltan = {'cliente', 'linea'} - set(df.columns)
+    if faltan: raise ValueError(f"Faltan columnas obligatorias: {', '.join(sorted(faltan))}")
+    df['linea'] = df['linea'].astype(str).str.strip().str.lower()
+    for col, valor in DEFECTOS.items():
+        df[col] = df[col].fillna(valor) if col in df.columns else valor
+    df['acabados'] = df['acabados'].map(_si_no)
+    desconocidas = set(df['linea']) - set(NOTAS)
+    if desconocidas: raise ValueError(f"Línea de negocio desconocida: {', '.join(sorted(desconocidas))}")
+    for linea, cols in REQUERIDAS.items():
+        filas = df['linea'] == linea
+        for col in cols:
+            if filas.any() and (col not in df.columns or df.loc[filas, col].isna().any()):
+                raise ValueError(f"Las filas de '{linea}' requieren la columna '{col}'")
+    return df.reset_index(drop=True)
+
+def _entradas(linea, g):
+    if linea == "domo": return {'ancho': g['ancho'].to_numpy(float), 'fondo': g['fondo'].to_numpy(float)}
+    if linea == "muro": return {'ml': g['ml'].to_numpy(float), 'altura': g['altura'].to_numpy(float), 'tipo': g['tipo'].to_numpy(str)}
+    if linea == "casa": return {'area': g['area'].to_numpy(float), 'estilo': g['estilo'].to_numpy(str)}
+    return {'vol': g['litros'].to_numpy(float)/1000}
+
+def _describir(linea, fila, res, i):
+    if linea == "domo":
+        return "Domo Ferrotek", f"Domo Geodésico/Evolutivo. Dimensiones Base: {fila.ancho}m x {fila.fondo}m. Altura Cumbrera: {res['geo']['h'][i]:.2f}m."
+    if linea == "muro":
+        return "Muro Perimetral", f"Muro {fila.tipo}. Dimensiones: {fila.ml}m Largo x {fila.altura}m Alto. Área Total: {fila.ml*fila.altura:.2f} m2. Sistema Ferrotek."
+    if linea == "casa":
+        return f"Casa {fila.estilo}", f"Casa {fila.estilo}. Área: {fila.area}m2."
+    return "Tanque de Agua", f"Tanque de Almacenamiento. Capacidad: {int(fila.litros)} Litros. Sistema Monolítico Impermeable."
+
+def cotizar_solicitudes(df, precios, margen):
+    """Precios de todas las filas (una pasada vectorizada por línea) + tareas de render"""
+    resumen = pd.DataFrame(index=df.index, columns=["Precio", "Materiales", "Mano de Obra", "Acabados", "Utilidad"], dtype=float)
+    tareas = [None] * len(df)
+    for (linea, acab), g in df.groupby(['linea', 'acabados'], sort=False):
+        res = motor_lotes.cotizar_lote(linea, _entradas(linea, g), precios, margen, acab)
+        n = len(g)
+        cols = [res["precio"], res["desglose"]["mat"], res["desglose"]["mo"], res["desglose"]["acab"], res["utilidad"]]
+        resumen.loc[g.index] = np.column_stack([np.broadcast_to(c, (n,)) for c in cols])
+        for i, (idx, fila) in enumerate(zip(g.index, g.itertuples(index=False))):
+            proyecto, desc = _describir(linea, fila, res, i)
+            datos = {"precio": float(resumen.at[idx, "Precio"]), "nota": NOTAS[linea],
+                     "version_precios": getattr(precios, 'version', None)}
+            tareas[idx] = (f"{idx+1:04d}_{_nombre_archivo(fila.cliente)}.pdf", str(fila.cliente), proyecto, datos, desc)
+    resumen.insert(0, "Archivo", [t[0] for t in tareas])
+    resumen.insert(0, "Línea", df['linea'])
+    resumen.insert(0, "Cliente", df['cliente'])
+    return resumen, tareas
+
+def _nombre_archivo(cliente):
+    limpio = "".join(c if c.isalnum() else "_" for c in str(cliente).strip())
+    return limpio[:40] or "cliente"
+
+def _render(tarea):
+    archivo, cliente, proyecto, datos, desc = tarea
+    return archivo, generar_pdf_cotizacion(cliente, proyecto, datos, desc)
+
+def _renderizar(tareas, procesos):
+    if procesos == 1 or len(tareas) < MIN_FILAS_POOL:
+        yield from map(_render, tareas)
+        return
+    # spawn: el servidor de Streamlit tiene hilos vivos y fork no es seguro ahí
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=ctx) as pool:
+        yield from pool.map(_render, tareas, chunksize=max(1, len(tareas) // (procesos * 4)))
+
+def escribir_zip(destino, df, precios, margen, procesos=None):
+    """Escribe el ZIP en destino (archivo o flujo no posicionable); devuelve el resumen"""
+    resumen, tareas = cotizar_solicitudes(df, precios, margen)
+    procesos = procesos or os.cpu_count() or 1
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for archivo, pdf in _renderizar(tareas, procesos):
+            zf.writestr(archivo, pdf)
+        zf.writestr("resumen.csv", resumen.to_csv(index=False))
+    return resumen
+
+class _Tubo(io.RawIOBase):
+    # Flujo de solo escritura que acumula lo escrito hasta que se drena
+    def __init__(self): self.trozos = []
+    def writable(self): return True
+    def write(self, b):
+        self.trozos.append(bytes(b)); return len(b)
+    def drenar(self):
+        datos = b"".join(self.trozos); self.trozos.clear(); return datos
+
+def zip_en_trozos(df, precios, margen, procesos=None):
+    """Generador de bytes del ZIP: cada PDF se entrega apenas se comprime"""
+    resumen, tareas = cotizar_solicitudes(df, precios, margen)
+    procesos = procesos or os.cpu_count() or 1
+    tubo = _Tubo()
+    with zipfile.ZipFile(tubo, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for archivo, pdf in _renderizar(tareas, procesos):
+            zf.writestr(archivo, pdf)
+            yield tubo.drenar()
+        zf.writestr("resumen.csv", resumen.to_csv(index=False))
+    yield tubo.drenar()
+
+# ==========================================
+# LÍNEA DE COMANDOS
+# ==========================================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cotización masiva Ferrotek: CSV de solicitudes -> ZIP de PDFs")
+    ap.add_argument("solicitudes", help="CSV con cliente, linea y dimensiones")
+    ap.add_argument("salida", help="ZIP de salida ('-' para stdout)")
+    ap.add_argument("--margen", type=float, default=30, help="Margen %% (por defecto 30)")
+    ap.add_argument("--precios", help="JSON con precios que reemplazan a los base")
+    ap.add_argument("--procesos", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    precios = dict(PRECIOS_BASE)
+    if args.precios:
+        with open(args.precios, encoding='utf-8') as f: precios.update(json.load(f))
+    df = leer_solicitudes(args.solicitudes)
+    if args.salida == '-':
+        resumen = escribir_zip(sys.stdout.buffer, df, precios, args.margen / 100, args.procesos)
+    else:
+        with open(args.salida, 'wb') as f:
+            resumen = escribir_zip(f, df, precios, args.margen / 100, args.procesos)
+    print(resumen.to_string(index=False, float_format=lambda v: f"{v:,.0f}"), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+from motor_costos import LIBRO_BASE, MARGEN_BASE, NOTAS, calcular_proyecto
+
+# ==========================================
+# COTIZADOR SIN INTERFAZ (CLI + HTTP LOCAL)
+# ==========================================
+# No importa Streamlit, pandas ni fpdf: arranca en milisegundos.
+#   python cotizador.py domo ancho=6 fondo=10
+#   python cotizador.py muro ml=25 altura=2.2 "tipo=Tipo 1 (Doble)" --margen 35
+#   python cotizador.py servir --puerto 8765
+#   curl 'localhost:8765/cotizar?linea=agua&vol=5'
+
+def _valor(texto):
+    try: return float(texto)
+    except ValueError: return texto
+
+def _si_no(valor):
+    # JSON puede traer "false"/"no"/"0" como texto: mismo criterio que la consulta GET
+    if isinstance(valor, str): return valor.strip().lower() not in ('0', 'false', 'no')
+    return bool(valor)
+
+def _libro(precios):
+    return LIBRO_BASE if not precios else LIBRO_BASE.con(**precios)
+
+def cotizar(solicitud):
+    """solicitud: {'linea', 'entrada', 'acabados'?, 'margen'? (%), 'precios'? (reemplazos)}"""
+    linea = solicitud.get('linea')
+    if linea not in NOTAS: raise ValueError(f"Línea de negocio desconocida: {linea}")
+    margen = float(solicitud.get('margen', MARGEN_BASE * 100)) / 100
+    if not 0 <= margen < 1: raise ValueError("El margen debe estar entre 0 y 100")
+    if not isinstance(solicitud.get('entrada', {}), dict): raise ValueError("'entrada' debe ser un objeto")
+    try:
+        return calcular_proyecto(solicitud.get('entrada', {}), linea, _si_no(solicitud.get('acabados', True)),
+                                 _libro(solicitud.get('precios')), margen)
+    except KeyError as e:
+        raise ValueError(f"Falta el dato {e} para la línea '{linea}'")
+
+class _Manejador(BaseHTTPRequestHandler):
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode()
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _atender(self, solicitud):
+        t0 = time.perf_counter()
+        try:
+            res = cotizar(solicitud)
+        except (ValueError, TypeError) as e:
+            return self._responder(400, {"error": str(e)})
+        res["ms"] = (time.perf_counter() - t0) * 1000
+        self._responder(200, res)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/salud": return self._responder(200, {"ok": True})
+        if url.path != "/cotizar": return self._responder(404, {"error": "Ruta no encontrada"})
+        q = dict(parse_qsl(url.query))
+        solicitud = {k: q.pop(k) for k in ('linea', 'margen') if k in q}
+        if 'acabados' in q: solicitud['acabados'] = q.pop('acabados')
+        solicitud['entrada'] = {k: _valor(v) for k, v in q.items()}
+        self._atender(solicitud)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/cotizar": return self._responder(404, {"error": "Ruta no encontrada"})
+        try:
+            solicitud = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self._responder(400, {"error": "JSON inválido"})
+        if not isinstance(solicitud, dict): return self._responder(400, {"error": "El cuerpo debe ser un objeto JSON"})
+        self._atender(solicitud)
+
+    def log_message(self, formato, *args):
+        pass
+
+def servir(host="127.0.0.1", puerto=8765):
+    servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+    print(f"Cotizador Ferrotek en http://{host}:{puerto}/cotizar", file=sys.stderr)
+    try: servidor.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: servidor.server_close()
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["servir"]:
+        ap = argparse.ArgumentParser(prog="cotizador.py servir")
+        ap.add_argument("--host", default="127.0.0.1"); ap.add_argument("--puerto", type=int, default=8765)
+        args = ap.parse_args(argv[1:])
+        return servir(args.host, args.puerto)
+    ap = argparse.ArgumentParser(description="Cotizador Ferrotek sin interfaz")
+    ap.add_argument("linea", choices=sorted(NOTAS))
+    ap.add_argument("datos", nargs="*", help="clave=valor (ancho, fondo, ml, altura, tipo, area, estilo, vol)")
+    ap.add_argument("--margen", type=float, default=MARGEN_BASE * 100, help="Margen %%")
+    ap.add_argument("--sin-acabados", action="store_true")
+    ap.add_argument("--precios", help="JSON con precios que reemplazan a los base")
+    args = ap.parse_args(argv)
+    precios = None
+    try:
+        if args.precios:
+            with open(args.precios, encoding='utf-8') as f: precios = json.load(f)
+        malos = [d for d in args.datos if "=" not in d]
+        if malos: raise ValueError(f"Datos sin el formato clave=valor: {', '.join(malos)}")
+        entrada = dict(d.split("=", 1) for d in args.datos)
+        res = cotizar({'linea': args.linea, 'entrada': {k: _valor(v) for k, v in entrada.items()},
+                       'acabados': not args.sin_acabados, 'margen': args.margen, 'precios': precios})
+    except (ValueError, TypeError) as e:
+        ap.error(str(e))
+    print(json.dumps(res, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from fpdf import FPDF
+from datetime import datetime
+
+# ==========================================
+# GENERADOR PDF (FIRMADO V124)
+# ==========================================
+class PDFDossier(FPDF):
+    def header(self):
+        self.set_font('Arial', 'B', 16); self.cell(0, 10, 'FERROTEK S.A.S', 0, 1, 'C')
+        self.set_font('Arial', 'I', 10); self.cell(0, 10, 'Innovación Constructiva', 0, 1, 'C'); self.ln(5)
+
+    def generar_guia_diseno(self):
+        self.add_page()
+        self.set_font('Arial', 'B', 20); self.set_text_color(0, 51, 102)
+        self.cell(0, 15, "FILOSOFIA DE DISEÑO FERROTEK", 0, 1, 'C')
+        self.line(10, 25, 200, 25); self.ln(10)
+        self.set_text_color(0); self.set_font('Arial', 'B', 12); self.cell(0, 10, "1. EL METRO CUADRADO UTIL", 0, 1)
+        self.set_font('Arial', '', 11); self.multi_cell(0, 6, "Gane hasta 4 m2 adicionales de espacio útil gracias a nuestros muros de alta resistencia y bajo espesor.")
+        self.ln(5)
+        self.set_font('Arial', 'B', 12); self.cell(0, 10, "2. FLEXIBILIDAD", 0, 1)
+        self.set_font('Arial', '', 11); self.multi_cell(0, 6, "Bóvedas sin columnas internas. Use puertas corredizas para espacios dinámicos.")
+        self.ln(5)
+        self.set_font('Arial', 'I', 10); self.set_text_color(100); self.cell(0, 10, "Ferrotek: Asesoria Arquitectonica Incluida.", 0, 1, 'C')
+
+def generar_pdf_cotizacion(cliente, proyecto, datos, desc):
+    pdf = PDFDossier(); pdf.add_page(); pdf.set_font('Arial', '', 12)
+    
+    # DATOS DEL CLIENTE (DESTACADO)
+    pdf.set_fill_color(240, 240, 240)
+    pdf.cell(0, 10, f"PARA: {cliente.upper()}", 0, 1, 'L', 1)
+    pdf.cell(0, 10, f"FECHA: {datetime.now().strftime('%d/%m/%Y')}", 0, 1, 'L')
+    pdf.ln(5)
+    
+    # TITULO Y DESCRIPCION
+    pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, f"REF: {proyecto.upper()}", 0, 1)
+    pdf.set_font('Arial', '', 11); pdf.multi_cell(0, 6, desc); pdf.ln(8)
+    
+    # PRECIO (RESALTADO)
+    pdf.set_fill_color(220, 230, 240)
+    pdf.set_font('Arial', 'B', 16); pdf.cell(0, 15, f"INVERSION TOTAL: ${datos['precio']:,.0f}", 0, 1, 'C', 1)
+    
+    # NOTA TECNICA
+    pdf.ln(5)
+    if 'nota' in datos:
+        pdf.set_font('Arial', 'B', 9); pdf.set_text_color(100, 0, 0)
+        pdf.multi_cell(0, 5, f"NOTA TECNICA: {datos['nota']}")
+        pdf.set_text_color(0)
+    
+    # CONDICIONES
+    pdf.ln(5); pdf.set_font('Arial', 'I', 8)
+    pdf.multi_cell(0, 4, "Validez: 15 días. Forma de pago: 50% Anticipo, 50% Avance de Obra. Incluye dirección técnica.")
+    if datos.get('version_precios'):
+        pdf.cell(0, 4, f"Lista de precios v{datos['version_precios']}", 0, 1)
+    
+    # FIRMA DEL GERENTE (NUEVO)
+    pdf.ln(25)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.cell(0, 5, "______________________________________", 0, 1)
+    pdf.cell(0, 5, "MANUEL ENRIQUE PRADA FORERO", 0, 1)
+    pdf.set_font('Arial', '', 10)
+    pdf.cell(0, 5, "Gerente General | Ferrotek S.A.S", 0, 1)
+    pdf.cell(0, 5, "Abogado & Director Jurídico", 0, 1)
+    
+    return bytes(pdf.output(dest='S'))
+
+def generar_portafolio(tipo="master"):
+    pdf = PDFDossier()
+    if tipo == "guia": 
+        pdf.generar_guia_diseno()
+        return bytes(pdf.output(dest='S'))
+        
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 24); pdf.set_text_color(0, 51, 102); pdf.cell(0, 20, "PORTAFOLIO FERROTEK", 0, 1, 'C')
+    pdf.set_font('Arial', '', 11); pdf.set_text_color(0)
+    if tipo in ["master", "casas"]:
+        pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, "1. LINEA VIVIENDA", 0, 1)
+        pdf.multi_cell(0, 6, "A. SERIE TRADICIONAL: Techo PVC 2 aguas.\nB. SERIE M: Minimalista cúbica.")
+        pdf.ln(5)
+    if tipo in ["master", "muros"]:
+        pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, "2. LINEA MUROS", 0, 1); pdf.multi_cell(0, 6, "Cerramientos alta resistencia."); pdf.ln(5)
+    if tipo in ["master", "domos"]:
+        pdf.set_font('Arial', 'B', 14); pdf.cell(0, 10, "3. LINEA DOMOS", 0, 1); pdf.multi_cell(0, 6, "Bóvedas evolutivas."); pdf.ln(5)
+    return bytes(pdf.output(dest='S'))
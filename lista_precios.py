@@ -0,0 +1,120 @@
+import threading
+import numpy as np
+import pandas as pd
+import motor_lotes
+from almacen_precios import PRECIOS_INICIALES
+from core_planos import EQUIVALENCIAS_CORE, PRECIOS_CORE, CoreFerrotek
+from solucionador import MODELOS_CASA
+
+# ==========================================
+# LISTA DE PRECIOS (MATRIZ DE CANTIDADES)
+# ==========================================
+# Con las dimensiones fijas, el costo de cada producto es lineal en los precios:
+# costo = fijo + sum(cantidad_k * precio_k), y se vende a costo / (1 - margen).
+# Cada producto se compila una sola vez a un vector disperso de cantidades
+# (evaluando el motor con precios unitarios). Repreciar el catálogo es entonces
+# un producto matriz-vector, y editar un precio solo suma delta * columna a los
+# productos que usan ese insumo.
+DOMOS_ESTANDAR = {"Vivienda 6x10": (6.0, 10.0, True), "Vivienda 6x12": (6.0, 12.0, True),
+                  "Garage 3.8x6": (3.8, 6.0, False), "Garage 3.8x10": (3.8, 10.0, False)}
+MUROS_ESTANDAR = [(tipo, ml) for tipo in ("Tipo 2 (Sencillo)", "Tipo 1 (Doble)") for ml in (10.0, 25.0, 50.0)]
+ALTURA_MURO = 2.2
+TANQUES_ESTANDAR = (1000, 5000, 10000, 20000)
+CORE_ESTANDAR = {"Muro Perimetral Raíz 2.20m (40 ml)": ("costo_muro_perimetral", 40.0),
+                 "Vivienda Unibody 60m2": ("costo_vivienda_unibody", 60.0),
+                 "Bóveda V58 3.80m x 12m": ("costo_boveda_v58", 12.0)}
+
+# Todas las claves van en el libro versionado (almacen_precios); el precio de referencia
+# solo cubre libros que no las traen (LIBRO_BASE o versiones anteriores al Core)
+CLAVES = list(PRECIOS_INICIALES)
+
+def _core(metodo, dimension):
+    def costo(P):
+        core = CoreFerrotek({k: P[EQUIVALENCIAS_CORE.get(k, k)] for k in PRECIOS_CORE}, 0)
+        return getattr(core, metodo)(dimension)
+    return costo
+
+def productos():
+    """[(línea, producto, costo(P), redondea a miles)] del catálogo estándar"""
+    items = []
+    for nombre, (area, estilo) in MODELOS_CASA.items():
+        for acab in (True, False):
+            items.append(("Casas", f"{nombre} {'Llave en Mano' if acab else 'Obra Gris'}",
+                          lambda P, a=area, t=estilo == 'Tradicional', acab=acab: motor_lotes.cotizar_casas(a, t, P, 0, acab)["precio"], False))
+    for nombre, (ancho, fondo, acab) in DOMOS_ESTANDAR.items():
+        items.append(("Domos", nombre, lambda P, a=ancho, f=fondo, acab=acab: motor_lotes.cotizar_domos(a, f, P, 0, acab)["precio"], False))
+    for tipo, ml in MUROS_ESTANDAR:
+        items.append(("Muros", f"{tipo} {ml:g} m x {ALTURA_MURO} m",
+                      lambda P, ml=ml, d="Doble" in tipo: motor_lotes.cotizar_muros(ml, ALTURA_MURO, d, P, 0)["precio"], False))
+    for litros in TANQUES_ESTANDAR:
+        items.append(("Agua", f"Tanque {litros:,} L", lambda P, v=litros / 1000: motor_lotes.cotizar_tanques(v, P, 0)["precio"], False))
+    for nombre, (metodo, dimension) in CORE_ESTANDAR.items():
+        items.append(("Core", nombre, _core(metodo, dimension), True))
+    return items
+
+class ListaPrecios:
+    def __init__(self, items=None):
+        items = productos() if items is None else items
+        self.lineas = [i[0] for i in items]; self.nombres = [i[1] for i in items]
+        self.redondeo = np.array([i[3] for i in items])
+        k = len(CLAVES)
+        # Columna j = precio unitario en la clave j; la última (todo en cero) da la parte fija
+        unitarios = {c: np.eye(k + 1)[j] for j, c in enumerate(CLAVES)}
+        filas, cols, vals, self.fijos = [], [], [], np.zeros(len(items))
+        for i, (_, _, costo, _) in enumerate(items):
+            c = np.broadcast_to(np.asarray(costo(unitarios), dtype=float), (k + 1,))
+            self.fijos[i] = c[k]
+            q = c[:k] - c[k]
+            nz = np.flatnonzero(q)
+            filas += [i] * len(nz); cols += nz.tolist(); vals += q[nz].tolist()
+        # Triplas ordenadas por columna: cada insumo es un tramo contiguo (para los deltas)
+        orden = np.argsort(cols, kind="stable")
+        self.filas = np.array(filas, dtype=np.intp)[orden]; self.cols = np.array(cols, dtype=np.intp)[orden]
+        self.vals = np.array(vals)[orden]
+        self.inicio_col = np.searchsorted(self.cols, np.arange(k + 1))
+        self._lock = threading.Lock()
+        self._p = None; self._costos = None
+        self.conteo = {"completos": 0, "incrementales": 0}
+
+    def vector(self, precios):
+        return np.array([float(precios.get(c, PRECIOS_INICIALES[c])) for c in CLAVES])
+
+    def _completo(self, p):
+        return self.fijos + np.bincount(self.filas, self.vals * p[self.cols], minlength=len(self.fijos))
+
+    def costos(self, precios):
+        """Costo directo de cada producto; solo reprecia las columnas que cambiaron"""
+        p = self.vector(precios)
+        with self._lock:
+            cambios = None if self._p is None else np.flatnonzero(p != self._p)
+            if cambios is None or len(cambios) > len(CLAVES) // 2:
+                self._costos = self._completo(p); self.conteo["completos"] += 1
+            elif len(cambios):
+                costos = self._costos.copy()
+                for j in cambios:
+                    a, b = self.inicio_col[j], self.inicio_col[j + 1]
+                    costos[self.filas[a:b]] += (p[j] - self._p[j]) * self.vals[a:b]
+                self._costos = costos; self.conteo["incrementales"] += 1
+            self._p = p
+            return self._costos
+
+    def precios(self, precios, margen):
+        venta = self.costos(precios) / (1 - margen)
+        return np.where(self.redondeo, np.round(venta, -3), venta)
+
+    def tabla(self, precios, margen):
+        return pd.DataFrame({"Línea": self.lineas, "Producto": self.nombres, "Precio": self.precios(precios, margen)})
+
+    def uso(self):
+        """Productos afectados por cada clave de precio"""
+        return {c: int(self.inicio_col[j + 1] - self.inicio_col[j]) for j, c in enumerate(CLAVES)}
+
+_lista = None
+_lock_lista = threading.Lock()
+
+def obtener_lista():
+    """Catálogo compilado una vez por proceso (lo comparten todas las sesiones)"""
+    global _lista
+    with _lock_lista:
+        if _lista is None: _lista = ListaPrecios()
+        return _lista
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ==========================================
+# MÉTRICAS POR RERUN (GERENCIA)
+# ==========================================
+# Tramos de tiempo y contadores por ejecución del script. Apagado por defecto:
+# mientras esté inactivo, tramo() y contar() no hacen nada. Cada sesión de
+# Streamlit corre en su propio hilo, así que el rerun en curso es local al hilo.
+# Las descargas diferidas (PDF) corren después, en el hilo de la petición y fuera
+# de todo rerun: se acumulan por proceso con descarga().
+HISTORIAL_MAX = 200
+RUTA_EXPORTACION = os.path.join('.cache', 'metricas.jsonl')
+
+_estado = {"activo": False}
+_hilo = threading.local()
+_lock = threading.Lock()
+_historial = deque(maxlen=HISTORIAL_MAX)
+_descargas = {}
+
+def activo():
+    return _estado["activo"]
+
+def activar(valor=True):
+    _estado["activo"] = bool(valor)
+
+def iniciar_rerun():
+    _hilo.rerun = {"inicio": time.time(), "t0": time.perf_counter(), "tramos": {}, "contadores": {}} if activo() else None
+
+def cerrar_rerun(vista=None):
+    rerun = getattr(_hilo, "rerun", None)
+    _hilo.rerun = None
+    if rerun is None: return
+    registro = {"fecha": rerun["inicio"], "vista": vista, "total_ms": (time.perf_counter() - rerun["t0"]) * 1000,
+                "tramos": rerun["tramos"], "contadores": rerun["contadores"]}
+    with _lock: _historial.append(registro)
+
+@contextmanager
+def tramo(nombre):
+    rerun = getattr(_hilo, "rerun", None)
+    if rerun is None:
+        yield; return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        rerun["tramos"][nombre] = rerun["tramos"].get(nombre, 0.0) + (time.perf_counter() - t0) * 1000
+
+@contextmanager
+def fragmento(vista, nombre="calculadora"):
+    """Tramo de un st.fragment; en un rerun parcial (sin rerun abierto) registra uno propio"""
+    propio = activo() and getattr(_hilo, "rerun", None) is None
+    if propio: iniciar_rerun()
+    try:
+        with tramo(nombre): yield
+    finally:
+        if propio: cerrar_rerun(f"{vista} (fragmento)")
+
+@contextmanager
+def descarga(nombre):
+    """Tiempo y bytes (medida["bytes"]) de una descarga diferida, acumulados en el proceso"""
+    medida = {"bytes": 0}
+    if not activo():
+        yield medida; return
+    t0 = time.perf_counter()
+    try:
+        yield medida
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        with _lock:
+            d = _descargas.setdefault(nombre, {"descargas": 0, "ms": 0.0, "bytes": 0})
+            d["descargas"] += 1; d["ms"] += ms; d["bytes"] += medida["bytes"]
+
+def descargas():
+    with _lock: return {k: dict(v) for k, v in _descargas.items()}
+
+def contar(nombre, n=1):
+    rerun = getattr(_hilo, "rerun", None)
+    if rerun is not None: rerun["contadores"][nombre] = rerun["contadores"].get(nombre, 0) + n
+
+def historial(n=None):
+    """Últimos n reruns (el más reciente al final)"""
+    with _lock: registros = list(_historial)
+    return registros[-n:] if n else registros
+
+def limpiar():
+    with _lock: _historial.clear(); _descargas.clear()
+
+def exportar_jsonl(ruta=RUTA_EXPORTACION, n=None):
+    """Agrega los reruns al archivo JSONL local; devuelve cuántos escribió"""
+    registros = historial(n)
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    with open(ruta, 'a', encoding='utf-8') as f:
+        for r in registros: f.write(json.dumps(r, ensure_ascii=False) + '\n')
+    return len(registros)
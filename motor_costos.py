@@ -0,0 +1,240 @@
+import hashlib
+import json
+import math
+import numbers
+from collections.abc import Mapping
+from cache_lru import CacheLRU
+
+# ==========================================
+# MOTOR DE COSTOS (V123) - NÚCLEO SIN STREAMLIT
+# ==========================================
+# Solo depende de la biblioteca estándar: se puede importar desde la CLI,
+# el servidor HTTP, procesos de lotes o la vitrina sin arrancar Streamlit.
+PRECIOS_BASE = {'cemento_gris_50kg': 29500, 'cal_hidratada_25kg': 25000, 'arena_rio_m3': 98000,
+    'malla_5mm_m2': 28000, 'perfil_pgc90_ml': 18500, 'dia_cuadrilla': 250000, 'valor_acabados_m2': 450000, 'valor_acabados_vis_m2': 350000}
+MARGEN_BASE = 0.30
+ALTURA_PARAL_CASA = 2.4; LARGO_CORREA_CASA = 3.0  # despiece de perfiles en casas (muro / cubierta)
+
+NOTAS = {
+    "domo": "DISEÑO: Oriente el ventanal al NORTE/SUR. Use 'Barn Doors' (Corredizas) para separar cocina.",
+    "muro": "NORMA: Curado con agua 3 veces/día por 4 días. Anclaje inferior obligatorio cada 60cm.",
+    "casa": "DISEÑO: Dejar paso lateral de 90cm en el lote. Comedor con vista al patio (ventanal grande).",
+    "agua": "NORMA: Vibrado manual obligatorio. Usar aditivo impermeabilizante.",
+}
+
+class PriceBook(Mapping):
+    """Lista de precios inmutable; cualquier cambio produce un libro nuevo.
+    version identifica la versión guardada en el almacén (None si no viene de ahí)"""
+    __slots__ = ('_precios', '_huella', 'version')
+
+    def __init__(self, precios=None, version=None):
+        datos = dict(PRECIOS_BASE if precios is None else precios)
+        for clave, valor in datos.items():
+            if isinstance(valor, bool) or not isinstance(valor, numbers.Real) or valor < 0:
+                raise ValueError(f"Precio inválido para '{clave}': {valor!r}")
+        object.__setattr__(self, '_precios', datos)
+        object.__setattr__(self, '_huella', None)
+        object.__setattr__(self, 'version', version)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("PriceBook es inmutable; use con(...) para derivar uno nuevo")
+
+    def __getitem__(self, clave): return self._precios[clave]
+    def __iter__(self): return iter(self._precios)
+    def __len__(self): return len(self._precios)
+    def __hash__(self): return hash(self.huella)
+    def __repr__(self): return f"PriceBook({self._precios!r}, version={self.version!r})"
+
+    @property
+    def huella(self):
+        """SHA-256 del contenido: identifica la lista de precios sin importar el orden"""
+        if self._huella is None:
+            texto = json.dumps({k: float(v) for k, v in self._precios.items()}, sort_keys=True)
+            object.__setattr__(self, '_huella', hashlib.sha256(texto.encode()).hexdigest())
+        return self._huella
+
+    def con(self, **cambios):
+        return PriceBook({**self._precios, **cambios})
+
+LIBRO_BASE = PriceBook()
+
+def calcular_proyecto(input_data, linea_negocio="general", incluye_acabados=True, precios=LIBRO_BASE, margen=MARGEN_BASE):
+    """Cotiza un proyecto; margen es la fracción de utilidad sobre el precio (0.30 = 30%)"""
+    P = precios
+    
+    lista_mat = [] 
+    nota_tecnica = ""
+    
+    # --- DOMOS ---
+    if linea_negocio == "domo":
+        ancho = input_data['ancho']; fondo = input_data['fondo']
+        alt_m = 0.80; radio = ancho/2.0; alt_c = alt_m + radio 
+        
+        perim_arco = (math.pi * radio) + (alt_m * 2)
+        area_timp = (math.pi * radio**2) + (2 * ancho * alt_m)
+        area_tot = (perim_arco * fondo) + area_timp
+        
+        num_arcos = math.ceil(fondo/0.6) + 1
+        ml_pgc_tot = (num_arcos * perim_arco) + (area_timp * 3.5)
+        cant_tubos = math.ceil(ml_pgc_tot / 6.0)
+        cant_malla = math.ceil(area_tot * 2.1) 
+        cant_cemento = math.ceil(area_tot * 0.35) 
+        cant_arena = math.ceil(area_tot * 0.05)
+        
+        lista_mat = [
+            {"Insumo": "Perfil Estructural PGC 90x40 Cal.22 (6m)", "Cant": cant_tubos, "Unid": "Tubos", "Costo": cant_tubos * 6 * P['perfil_pgc90_ml']},
+            {"Insumo": "Malla Electrosoldada 5mm (15x15)", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla * P['malla_5mm_m2']},
+            {"Insumo": "Cemento Estructural (Tipo ART)", "Cant": cant_cemento, "Unid": "Bultos", "Costo": cant_cemento * P['cemento_gris_50kg']},
+            {"Insumo": "Arena de Río Lavada", "Cant": cant_arena, "Unid": "m3", "Costo": cant_arena * P['arena_rio_m3']},
+            {"Insumo": "Tornillería Wafer/Extraplanos", "Cant": math.ceil(area_tot*40), "Unid": "Und", "Costo": area_tot * 40 * 150},
+            {"Insumo": "Anclajes Cimentación 3/8", "Cant": math.ceil(fondo/0.6)*2, "Unid": "Und", "Costo": math.ceil(fondo/0.6)*2 * 2500}
+        ]
+        
+        c_mat = sum([item['Costo'] for item in lista_mat]) 
+        c_mo = math.ceil(ancho*fondo/2.0) * P['dia_cuadrilla']
+        c_acab = (ancho*fondo * P.get('valor_acabados_vis_m2', 350000)) if incluye_acabados else 0
+        total = c_mat + c_mo + c_acab
+        
+        nota_tecnica = NOTAS["domo"]
+        # Cantidades antes de redondear y despiece PGC [(largo pieza, ml)]: consolidacion.py
+        # suma varias obras, redondea una sola vez y empaca las piezas en tubos de 6 m
+        despiece = [(perim_arco, num_arcos * perim_arco), (alt_c, area_timp * 3.5)]
+        exactos = dict(zip([m['Insumo'] for m in lista_mat],
+                           [ml_pgc_tot/6.0, area_tot*2.1, area_tot*0.35, area_tot*0.05, area_tot*40, math.ceil(fondo/0.6)*2]))
+        
+        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
+                "geo": {"h": alt_c, "area": area_tot}, 
+                "desglose": {"mat":c_mat, "mo":c_mo, "acab":c_acab}, "materiales": lista_mat, "nota": nota_tecnica, "exactos": exactos,
+                "despiece_pgc": despiece, "version_precios": getattr(P, 'version', None)}
+
+    # --- MUROS ---
+    elif linea_negocio == "muro":
+        ml = input_data['ml']; alt = input_data['altura']; area = ml*alt
+        tipo = input_data['tipo']; es_doble = "Doble" in tipo
+        
+        f_perf = 1.8 if es_doble else 1.5 
+        f_malla = 2.1 if es_doble else 1.1 
+        f_cem = 0.4 if es_doble else 0.25 
+        
+        ml_perf = area * f_perf
+        cant_tubos = math.ceil(ml_perf / 6.0)
+        cant_malla = math.ceil(area * f_malla)
+        cant_cemento = math.ceil(area * f_cem)
+        
+        cant_tornillos = math.ceil(area * 30)
+        cant_anclajes = math.ceil(ml / 0.60) 
+        
+        vol_cinta = ml * 0.20 * 0.25
+        cant_cem_cim = math.ceil(vol_cinta * 7)
+        cant_arena_cim = vol_cinta * 1.1
+        
+        lista_mat = [
+            {"Insumo": "Perfil PGC 90x40 Cal.22 (Parales)", "Cant": cant_tubos, "Unid": "Tubos", "Costo": cant_tubos*6*P['perfil_pgc90_ml']},
+            {"Insumo": "Malla Electrosoldada 4mm/5mm", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla*P['malla_5mm_m2']},
+            {"Insumo": "Tornillería Extraplana (Wafer)", "Cant": cant_tornillos, "Unid": "Und", "Costo": cant_tornillos * 150},
+            {"Insumo": "Pernos Expansivos 3/8 (Anclaje)", "Cant": cant_anclajes, "Unid": "Und", "Costo": cant_anclajes * 3500},
+            {"Insumo": "Cemento Gris (Muro + Cimentación)", "Cant": cant_cemento+cant_cem_cim, "Unid": "Bultos", "Costo": (cant_cemento+cant_cem_cim)*P['cemento_gris_50kg']},
+            {"Insumo": "Arena Lavada (Mezcla A)", "Cant": math.ceil(cant_arena_cim), "Unid": "m3", "Costo": (cant_arena_cim)*P['arena_rio_m3']}
+        ]
+        
+        c_mat = sum([item['Costo'] for item in lista_mat])
+        c_mo = (area/5.0 * P['dia_cuadrilla']) * (1.5 if es_doble else 1.0)
+        total = c_mat + c_mo
+        
+        nota_tecnica = NOTAS["muro"]
+        despiece = [(alt, ml_perf)]
+        exactos = dict(zip([m['Insumo'] for m in lista_mat],
+                           [ml_perf/6.0, area*f_malla, area*30, cant_anclajes, area*f_cem + vol_cinta*7, cant_arena_cim]))
+        
+        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
+                "desglose": {"mat":c_mat, "mo":c_mo, "acab":0}, "materiales": lista_mat, "nota": nota_tecnica, "exactos": exactos,
+                "despiece_pgc": despiece, "version_precios": getattr(P, 'version', None)}
+
+    # --- CASAS ---
+    elif linea_negocio == "casa":
+        area = input_data['area']
+        estilo = input_data.get('estilo', 'Tradicional')
+        
+        if estilo == 'Tradicional':
+            fac_muros = 2.8; fac_techo = 1.4; nom_teja = "Teja PVC Colonial (Roja)"; p_teja = 60000
+        else: # Serie M
+            fac_muros = 2.6; fac_techo = 1.2; nom_teja = "Teja PVC Termoacústica (Blanca)"; p_teja = 45000
+
+        area_muros = area * fac_muros
+        area_techo = area * fac_techo
+        
+        cant_tubos_muro = math.ceil((area_muros * 1.5) / 6.0)
+        cant_tubos_techo = math.ceil((area_techo * 1.2) / 6.0)
+        cant_malla = math.ceil(area_muros * 2.2)
+        cant_cemento = math.ceil(area_muros * 0.35 + (area*0.1*7))
+        cant_tejas = math.ceil(area_techo / 1.8)
+        
+        cant_tornillos = math.ceil((area_muros + area_techo) * 35)
+        cant_kit_teja = math.ceil(area_techo * 4) 
+        
+        lista_mat = [
+            {"Insumo": "Perfil PGC 90x40 Cal.22 (Total)", "Cant": cant_tubos_muro+cant_tubos_techo, "Unid": "Tubos", "Costo": (cant_tubos_muro+cant_tubos_techo)*6*P['perfil_pgc90_ml']},
+            {"Insumo": f"Cubierta: {nom_teja}", "Cant": cant_tejas, "Unid": "Hojas", "Costo": cant_tejas*1.8*p_teja},
+            {"Insumo": "Kit Fijación Teja", "Cant": cant_kit_teja, "Unid": "Und", "Costo": cant_kit_teja * 800},
+            {"Insumo": "Tornillería Estructura (Wafer)", "Cant": cant_tornillos, "Unid": "Und", "Costo": cant_tornillos * 150},
+            {"Insumo": "Malla Electrosoldada 5mm", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla*P['malla_5mm_m2']},
+            {"Insumo": "Cemento Estructural (Gris)", "Cant": cant_cemento, "Unid": "Bultos", "Costo": cant_cemento*P['cemento_gris_50kg']},
+            {"Insumo": "Agregados (Arena/Triturado)", "Cant": math.ceil(area*0.2), "Unid": "m3", "Costo": math.ceil(area*0.2)*P['arena_rio_m3']}
+        ]
+        
+        c_mat = sum([item['Costo'] for item in lista_mat]) 
+        c_mo = area * P['dia_cuadrilla'] * 1.1
+        c_acab = (area * P['valor_acabados_m2']) if incluye_acabados else 0
+        total = c_mat + c_mo + c_acab
+        
+        nota_tecnica = NOTAS["casa"]
+        despiece = [(ALTURA_PARAL_CASA, area_muros * 1.5), (LARGO_CORREA_CASA, area_techo * 1.2)]
+        exactos = dict(zip([m['Insumo'] for m in lista_mat],
+                           [(area_muros*1.5 + area_techo*1.2)/6.0, area_techo/1.8, area_techo*4, (area_muros + area_techo)*35,
+                            area_muros*2.2, area_muros*0.35 + area*0.1*7, area*0.2]))
+        
+        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
+                "desglose": {"mat": c_mat, "mo": c_mo, "acab": c_acab}, "materiales": lista_mat, "nota": nota_tecnica, "exactos": exactos,
+                "despiece_pgc": despiece, "version_precios": getattr(P, 'version', None)}
+
+    # --- AGUA ---
+    elif linea_negocio == "agua":
+        vol = input_data['vol']; h = 1.5; r = math.sqrt(vol/(math.pi*h)); area_m = 2*math.pi*r*h
+        cant_malla = math.ceil(area_m * 4)
+        cant_cemento = math.ceil(area_m * 0.6)
+        
+        lista_mat = [
+            {"Insumo": "Malla Hexagonal + Electrosoldada", "Cant": cant_malla, "Unid": "m2", "Costo": cant_malla*P['malla_5mm_m2']},
+            {"Insumo": "Cemento Impermeable / Holcim", "Cant": cant_cemento, "Unid": "Bultos", "Costo": cant_cemento*P['cemento_gris_50kg']},
+            {"Insumo": "Impermeabilizante Integral (Sika)", "Cant": 1, "Unid": "Kit", "Costo": 200000}
+        ]
+        c_mat = sum([item['Costo'] for item in lista_mat])
+        c_mo = area_m/2.0 * P['dia_cuadrilla']
+        total = c_mat + c_mo
+        
+        nota_tecnica = NOTAS["agua"]
+        exactos = dict(zip([m['Insumo'] for m in lista_mat], [area_m*4, area_m*0.6, 1]))
+        
+        return {"precio": total/(1-margen), "utilidad": (total/(1-margen))-total, 
+                "desglose": {"mat":c_mat, "mo":c_mo, "acab":0}, "materiales": lista_mat, "nota": nota_tecnica, "exactos": exactos,
+                "despiece_pgc": [], "version_precios": getattr(P, 'version', None)}
+
+    return {"precio": 0}
+
+# ==========================================
+# CACHE DE COTIZACIONES
+# ==========================================
+# La clave incluye la huella del PriceBook: editar un precio cambia la clave y
+# las entradas viejas salen solas por LRU. El resultado se comparte entre
+# sesiones, así que quien lo reciba no debe modificarlo.
+CACHE_COTIZACIONES = CacheLRU(capacidad=512)
+
+def _normalizar(input_data):
+    return tuple(sorted(
+        (k, float(v) if isinstance(v, numbers.Real) and not isinstance(v, bool) else str(v).strip())
+        for k, v in input_data.items()))
+
+def calcular_proyecto_cacheado(input_data, linea_negocio="general", incluye_acabados=True, precios=LIBRO_BASE, margen=MARGEN_BASE):
+    if not isinstance(precios, PriceBook): precios = PriceBook(precios)
+    clave = (linea_negocio, _normalizar(input_data), bool(incluye_acabados), float(margen), precios.huella, precios.version)
+    return CACHE_COTIZACIONES.obtener(clave, lambda: calcular_proyecto(input_data, linea_negocio, incluye_acabados, precios, margen))
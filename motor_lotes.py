@@ -0,0 +1,228 @@
+import numpy as np
+
+# ==========================================
+# MOTOR DE COSTOS POR LOTES (VECTORIZADO)
+# ==========================================
+# Mismas fórmulas que calcular_proyecto, pero sobre arreglos NumPy.
+# El orden de las operaciones se conserva tal cual para que cada precio sea
+# idéntico (bit a bit) al de la ruta escalar. Los precios también pueden ser
+# arreglos: se propagan por broadcasting junto con las dimensiones.
+
+def _ceil(x):
+    return np.ceil(x)
+
+def _sumar(costos):
+    # sum([...]) de la ruta escalar: acumulación de izquierda a derecha
+    total = 0
+    for c in costos.values():
+        total = total + c
+    return total
+
+def _resultado(costos, cantidades, c_mo, c_acab, margen, extra=None):
+    c_mat = _sumar(costos)
+    total = c_mat + c_mo + c_acab
+    precio = total / (1 - margen)
+    res = {"precio": precio, "utilidad": precio - total,
+           "desglose": {"mat": c_mat, "mo": c_mo, "acab": c_acab},
+           "cantidades": cantidades, "costos": costos}
+    if extra: res.update(extra)
+    return res
+
+def cotizar_domos(ancho, fondo, precios, margen, incluye_acabados=True):
+    """Domos: precio por lote de (ancho, fondo)"""
+    P = precios
+    ancho = np.asarray(ancho, dtype=float); fondo = np.asarray(fondo, dtype=float)
+    alt_m = 0.80; radio = ancho/2.0; alt_c = alt_m + radio
+
+    perim_arco = (np.pi * radio) + (alt_m * 2)
+    area_timp = (np.pi * radio**2) + (2 * ancho * alt_m)
+    area_tot = (perim_arco * fondo) + area_timp
+
+    num_arcos = _ceil(fondo/0.6) + 1
+    ml_pgc_tot = (num_arcos * perim_arco) + (area_timp * 3.5)
+    cant_tubos = _ceil(ml_pgc_tot / 6.0)
+    cant_malla = _ceil(area_tot * 2.1)
+    cant_cemento = _ceil(area_tot * 0.35)
+    cant_arena = _ceil(area_tot * 0.05)
+    cant_anclajes = _ceil(fondo/0.6)*2
+
+    cantidades = {
+        "Perfil Estructural PGC 90x40 Cal.22 (6m)": cant_tubos,
+        "Malla Electrosoldada 5mm (15x15)": cant_malla,
+        "Cemento Estructural (Tipo ART)": cant_cemento,
+        "Arena de Río Lavada": cant_arena,
+        "Tornillería Wafer/Extraplanos": _ceil(area_tot*40),
+        "Anclajes Cimentación 3/8": cant_anclajes,
+    }
+    costos = {
+        "Perfil Estructural PGC 90x40 Cal.22 (6m)": cant_tubos * 6 * P['perfil_pgc90_ml'],
+        "Malla Electrosoldada 5mm (15x15)": cant_malla * P['malla_5mm_m2'],
+        "Cemento Estructural (Tipo ART)": cant_cemento * P['cemento_gris_50kg'],
+        "Arena de Río Lavada": cant_arena * P['arena_rio_m3'],
+        "Tornillería Wafer/Extraplanos": area_tot * 40 * 150,
+        "Anclajes Cimentación 3/8": cant_anclajes * 2500,
+    }
+
+    c_mo = _ceil(ancho*fondo/2.0) * P['dia_cuadrilla']
+    c_acab = np.where(incluye_acabados, ancho*fondo * P.get('valor_acabados_vis_m2', 350000), 0)
+    return _resultado(costos, cantidades, c_mo, c_acab, margen, {"geo": {"h": alt_c, "area": area_tot}})
+
+def cotizar_muros(ml, altura, doble, precios, margen):
+    """Muros: precio por lote de (largo, alto, tipo). doble=True equivale a 'Tipo 1 (Doble)'"""
+    P = precios
+    ml = np.asarray(ml, dtype=float); altura = np.asarray(altura, dtype=float)
+    doble = np.asarray(doble, dtype=bool); area = ml*altura
+
+    f_perf = np.where(doble, 1.8, 1.5)
+    f_malla = np.where(doble, 2.1, 1.1)
+    f_cem = np.where(doble, 0.4, 0.25)
+
+    ml_perf = area * f_perf
+    cant_tubos = _ceil(ml_perf / 6.0)
+    cant_malla = _ceil(area * f_malla)
+    cant_cemento = _ceil(area * f_cem)
+
+    cant_tornillos = _ceil(area * 30)
+    cant_anclajes = _ceil(ml / 0.60)
+
+    vol_cinta = ml * 0.20 * 0.25
+    cant_cem_cim = _ceil(vol_cinta * 7)
+    cant_arena_cim = vol_cinta * 1.1
+
+    cantidades = {
+        "Perfil PGC 90x40 Cal.22 (Parales)": cant_tubos,
+        "Malla Electrosoldada 4mm/5mm": cant_malla,
+        "Tornillería Extraplana (Wafer)": cant_tornillos,
+        "Pernos Expansivos 3/8 (Anclaje)": cant_anclajes,
+        "Cemento Gris (Muro + Cimentación)": cant_cemento+cant_cem_cim,
+        "Arena Lavada (Mezcla A)": _ceil(cant_arena_cim),
+    }
+    costos = {
+        "Perfil PGC 90x40 Cal.22 (Parales)": cant_tubos*6*P['perfil_pgc90_ml'],
+        "Malla Electrosoldada 4mm/5mm": cant_malla*P['malla_5mm_m2'],
+        "Tornillería Extraplana (Wafer)": cant_tornillos * 150,
+        "Pernos Expansivos 3/8 (Anclaje)": cant_anclajes * 3500,
+        "Cemento Gris (Muro + Cimentación)": (cant_cemento+cant_cem_cim)*P['cemento_gris_50kg'],
+        "Arena Lavada (Mezcla A)": (cant_arena_cim)*P['arena_rio_m3'],
+    }
+
+    c_mo = (area/5.0 * P['dia_cuadrilla']) * np.where(doble, 1.5, 1.0)
+    return _resultado(costos, cantidades, c_mo, 0, margen)
+
+def cotizar_casas(area, tradicional, precios, margen, incluye_acabados=True):
+    """Casas: precio por lote de áreas. tradicional=False equivale a 'Serie M'"""
+    P = precios
+    area = np.asarray(area, dtype=float); tradicional = np.asarray(tradicional, dtype=bool)
+
+    fac_muros = np.where(tradicional, 2.8, 2.6)
+    fac_techo = np.where(tradicional, 1.4, 1.2)
+    p_teja = np.where(tradicional, 60000, 45000)
+
+    area_muros = area * fac_muros
+    area_techo = area * fac_techo
+
+    cant_tubos_muro = _ceil((area_muros * 1.5) / 6.0)
+    cant_tubos_techo = _ceil((area_techo * 1.2) / 6.0)
+    cant_malla = _ceil(area_muros * 2.2)
+    cant_cemento = _ceil(area_muros * 0.35 + (area*0.1*7))
+    cant_tejas = _ceil(area_techo / 1.8)
+
+    cant_tornillos = _ceil((area_muros + area_techo) * 35)
+    cant_kit_teja = _ceil(area_techo * 4)
+    cant_agregados = _ceil(area*0.2)
+
+    cantidades = {
+        "Perfil PGC 90x40 Cal.22 (Total)": cant_tubos_muro+cant_tubos_techo,
+        "Cubierta: Teja PVC": cant_tejas,
+        "Kit Fijación Teja": cant_kit_teja,
+        "Tornillería Estructura (Wafer)": cant_tornillos,
+        "Malla Electrosoldada 5mm": cant_malla,
+        "Cemento Estructural (Gris)": cant_cemento,
+        "Agregados (Arena/Triturado)": cant_agregados,
+    }
+    costos = {
+        "Perfil PGC 90x40 Cal.22 (Total)": (cant_tubos_muro+cant_tubos_techo)*6*P['perfil_pgc90_ml'],
+        "Cubierta: Teja PVC": cant_tejas*1.8*p_teja,
+        "Kit Fijación Teja": cant_kit_teja * 800,
+        "Tornillería Estructura (Wafer)": cant_tornillos * 150,
+        "Malla Electrosoldada 5mm": cant_malla*P['malla_5mm_m2'],
+        "Cemento Estructural (Gris)": cant_cemento*P['cemento_gris_50kg'],
+        "Agregados (Arena/Triturado)": cant_agregados*P['arena_rio_m3'],
+    }
+
+    c_mo = area * P['dia_cuadrilla'] * 1.1
+    c_acab = np.where(incluye_acabados, area * P['valor_acabados_m2'], 0)
+    return _resultado(costos, cantidades, c_mo, c_acab, margen)
+
+def cotizar_tanques(vol, precios, margen):
+    """Agua: precio por lote de volúmenes (m3)"""
+    P = precios
+    vol = np.asarray(vol, dtype=float)
+    h = 1.5; r = np.sqrt(vol/(np.pi*h)); area_m = 2*np.pi*r*h
+    cant_malla = _ceil(area_m * 4)
+    cant_cemento = _ceil(area_m * 0.6)
+
+    cantidades = {
+        "Malla Hexagonal + Electrosoldada": cant_malla,
+        "Cemento Impermeable / Holcim": cant_cemento,
+        "Impermeabilizante Integral (Sika)": np.ones_like(vol),
+    }
+    costos = {
+        "Malla Hexagonal + Electrosoldada": cant_malla*P['malla_5mm_m2'],
+        "Cemento Impermeable / Holcim": cant_cemento*P['cemento_gris_50kg'],
+        "Impermeabilizante Integral (Sika)": 200000,
+    }
+    c_mo = area_m/2.0 * P['dia_cuadrilla']
+    return _resultado(costos, cantidades, c_mo, 0, margen)
+
+def cotizar_lote(linea_negocio, entradas, precios, margen, incluye_acabados=True):
+    """Despacha por línea con las mismas claves de input_data que calcular_proyecto"""
+    if linea_negocio == "domo":
+        return cotizar_domos(entradas['ancho'], entradas['fondo'], precios, margen, incluye_acabados)
+    elif linea_negocio == "muro":
+        doble = np.char.find(np.asarray(entradas['tipo'], dtype=str), "Doble") >= 0
+        return cotizar_muros(entradas['ml'], entradas['altura'], doble, precios, margen)
+    elif linea_negocio == "casa":
+        estilo = np.asarray(entradas.get('estilo', 'Tradicional'), dtype=str)
+        return cotizar_casas(entradas['area'], estilo == 'Tradicional', precios, margen, incluye_acabados)
+    elif linea_negocio == "agua":
+        return cotizar_tanques(entradas['vol'], precios, margen)
+    raise ValueError(f"Línea de negocio desconocida: {linea_negocio}")
+
+# ==========================================
+# TABLAS DE PRECIOS (VENTAS)
+# ==========================================
+def rango(inicio, fin, paso=0.1):
+    """Valores de inicio a fin (inclusive) redondeados como los teclearía un vendedor"""
+    n = int(round((fin - inicio) / paso)) + 1
+    return np.round(inicio + paso * np.arange(n), 6)
+
+def _tabla(columnas, res):
+    import pandas as pd  # solo las tablas de ventas; el motor y el solucionador no lo necesitan
+    tabla = pd.DataFrame(columnas)
+    tabla["Precio"] = np.broadcast_to(res["precio"], tabla.index.shape)
+    tabla["Materiales"] = np.broadcast_to(res["desglose"]["mat"], tabla.index.shape)
+    tabla["Mano de Obra"] = np.broadcast_to(res["desglose"]["mo"], tabla.index.shape)
+    tabla["Acabados"] = np.broadcast_to(res["desglose"]["acab"], tabla.index.shape)
+    return tabla
+
+def tabla_domos(precios, margen, anchos=None, fondos=None, incluye_acabados=True):
+    """Todas las combinaciones ancho x fondo (por defecto los rangos de la vitrina, cada 0.1 m)"""
+    anchos = rango(2.0, 15.0) if anchos is None else np.asarray(anchos, dtype=float)
+    fondos = rango(3.0, 50.0) if fondos is None else np.asarray(fondos, dtype=float)
+    A, F = np.meshgrid(anchos, fondos, indexing='ij')
+    A = A.ravel(); F = F.ravel()
+    return _tabla({"Frente": A, "Fondo": F}, cotizar_domos(A, F, precios, margen, incluye_acabados))
+
+def tabla_muros(precios, margen, largos=None, altura=2.2):
+    """Cada largo para Tipo 2 (Sencillo) y Tipo 1 (Doble)"""
+    largos = rango(1.0, 100.0) if largos is None else np.asarray(largos, dtype=float)
+    L = np.concatenate([largos, largos])
+    doble = np.repeat([False, True], len(largos))
+    tipo = np.where(doble, "Tipo 1 (Doble)", "Tipo 2 (Sencillo)")
+    return _tabla({"Tipo": tipo, "Largo": L, "Alto": altura}, cotizar_muros(L, altura, doble, precios, margen))
+
+def tabla_tanques(precios, margen, litros=None):
+    """Cada capacidad del deslizador de la vitrina (1.000 a 20.000 L)"""
+    litros = np.arange(1000, 20001, 1000) if litros is None else np.asarray(litros)
+    return _tabla({"Litros": litros}, cotizar_tanques(litros/1000, precios, margen))
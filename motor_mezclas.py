@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# MOTOR DE MEZCLAS (FÁBRICA)
+# ==========================================
+DENSIDAD = {'cemento': 1.50, 'arena': 1.60, 'cal': 0.55, 'zeolita': 0.90}
+
+def calcular_produccion_lote(tipo_mezcla, cantidad_bultos_30kg_meta):
+    peso_total = cantidad_bultos_30kg_meta * 30
+    insumos = {}
+    if "Mezcla A" in tipo_mezcla: 
+        f = peso_total / 100.0
+        insumos = {'cemento_kg': 29.5*f, 'arena_kg': 66.5*f, 'carbonato_kg': 4.5*f, 'fibras_kg': 0.1*f, 'cal_kg':0, 'zeolita_kg':0}
+    elif "Mezcla B" in tipo_mezcla: 
+        den_mix = (1*1.5) + (3*1.6) + (3*0.55)
+        u = peso_total / den_mix
+        insumos = {'cemento_kg': u*1.5, 'arena_kg': u*4.8, 'cal_kg': u*1.65, 'carbonato_kg':0, 'zeolita_kg':0}
+    elif "Mezcla T" in tipo_mezcla: 
+        den_mix = (1*1.5) + (2*0.55) + (3*0.9)
+        u = peso_total / den_mix
+        insumos = {'cemento_kg': u*1.5, 'cal_kg': u*1.1, 'zeolita_kg': u*2.7, 'arena_kg':0, 'carbonato_kg':0}
+    return insumos
+
+# ==========================================
+# PLANIFICADOR DE PRODUCCIÓN (MULTI-LOTE)
+# ==========================================
+# Mismos coeficientes que calcular_produccion_lote, en forma de matriz: cada
+# lote es peso_total / divisor[tipo] * coeficientes[tipo]. Los productos son
+# los mismos que en la ruta escalar, así que los kg coinciden bit a bit.
+
+TIPOS = ("Mezcla A", "Mezcla B", "Mezcla T")
+INSUMOS = ('cemento_kg', 'arena_kg', 'cal_kg', 'carbonato_kg', 'zeolita_kg', 'fibras_kg')
+_DIVISOR = np.array([100.0, (1*1.5) + (3*1.6) + (3*0.55), (1*1.5) + (2*0.55) + (3*0.9)])
+_COEF = np.array([
+    [29.5, 66.5, 0, 4.5, 0, 0.1],   # A: porcentajes en peso
+    [1.5, 4.8, 1.65, 0, 0, 0],      # B: 1:3:3 cemento/arena/cal
+    [1.5, 0, 1.1, 0, 2.7, 0],       # T: 1:2:3 cemento/cal/zeolita
+])
+
+def _indice_tipo(tipos):
+    tipos = np.asarray(tipos, dtype=str)
+    idx = np.full(tipos.shape, -1)
+    for i, t in enumerate(TIPOS):
+        idx[(idx < 0) & (np.char.find(tipos, t) >= 0)] = i
+    return idx
+
+def requerimientos_lotes(tipos, bultos):
+    """Kg de cada insumo (columnas en orden INSUMOS) para cada lote; tipo desconocido -> 0"""
+    idx = _indice_tipo(tipos)
+    peso_total = np.asarray(bultos) * 30
+    valido = idx >= 0
+    base = np.where(valido, peso_total / _DIVISOR[np.where(valido, idx, 0)], 0.0)
+    return np.where(valido[:, None], base[:, None] * _COEF[np.where(valido, idx, 0)], 0.0)
+
+def planificar_produccion(pedidos, stock=None):
+    """pedidos: DataFrame con tipo, bultos, fecha (entrega). stock: {insumo: kg disponibles}.
+    Devuelve lotes, consumo diario y semanal con saldo acumulado contra el stock y faltantes."""
+    lotes = pedidos.reset_index(drop=True).copy()
+    lotes['fecha'] = pd.to_datetime(lotes['fecha']).dt.normalize()
+    kg = requerimientos_lotes(lotes['tipo'].to_numpy(str), lotes['bultos'].to_numpy())
+    lotes[list(INSUMOS)] = kg
+
+    diario = lotes.groupby('fecha', sort=True)[list(INSUMOS)].sum()
+    semanal = diario.groupby(diario.index.to_period('W').start_time).sum()
+    semanal.index.name = 'semana'
+    plan = {"lotes": lotes, "diario": diario, "semanal": semanal, "faltantes": {}}
+    if stock:
+        for tabla in (diario, semanal):
+            for insumo in INSUMOS:
+                if insumo in stock:
+                    tabla[f"saldo_{insumo}"] = stock[insumo] - tabla[insumo].cumsum()
+        for insumo in INSUMOS:
+            if insumo not in stock: continue
+            rojo = diario[f"saldo_{insumo}"] < 0
+            if rojo.any():
+                plan["faltantes"][insumo] = {"fecha": rojo.idxmax(), "kg": float(-diario[f"saldo_{insumo}"].min())}
+    return plan
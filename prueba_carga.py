@@ -0,0 +1,147 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import cache_pdf
+import catalogo_imagenes
+import motor_costos
+
+# ==========================================
+# PRUEBA DE CARGA (SESIONES SIMULTÁNEAS)
+# ==========================================
+#   python prueba_carga.py --sesiones 20 --rondas 3 --salida carga.json
+# Cada sesión recorre home -> domos -> nombre del cliente -> descarga del PDF, en
+# hilos de un mismo proceso, como en el servidor de Streamlit. AppTest usa un
+# runtime global, así que las ejecuciones del script se serializan con un lock
+# (el tiempo de espera cuenta en la latencia, igual que una cola en un núcleo).
+# La descarga corre fuera del lock, como la petición HTTP del servidor.
+# Reporta flujos/s, p50/p99 por paso y la RSS que agrega cada sesión viva.
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_vitrina.py")
+PASOS = ("home", "domos", "cliente", "pdf")
+
+_lock_runtime = threading.Lock()
+_diferidos = {}
+_aislado = []
+
+def aislar_datos():
+    """Almacén de precios y registro de cotizaciones en una carpeta temporal (no ensucia los de producción)"""
+    # Debe correr antes de que la app importe almacen_precios y registro_cotizaciones (leen la ruta al importarse)
+    if _aislado: return _aislado[0]
+    carpeta = tempfile.mkdtemp(prefix="ferrotek_prueba_")
+    os.environ["FERROTEK_DB"] = os.path.join(carpeta, "precios.db")
+    os.environ["FERROTEK_REGISTRO"] = os.path.join(carpeta, "cotizaciones")
+    atexit.register(shutil.rmtree, carpeta, True)  # después del vaciado del registro (atexit es LIFO)
+    _aislado.append(carpeta)
+    return carpeta
+
+def _registrar_diferidos():
+    # Guarda las funciones de descarga diferida para poder "hacer clic" en Descargar
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    original = MediaFileManager.add_deferred
+    if getattr(original, "_prueba_carga", False): return
+    def add_deferred(self, data_callable, *args, **kwargs):
+        file_id = original(self, data_callable, *args, **kwargs)
+        _diferidos[file_id] = data_callable
+        return file_id
+    add_deferred._prueba_carga = True
+    MediaFileManager.add_deferred = add_deferred
+
+def rss_mb():
+    """Memoria residente actual del proceso (Linux: /proc; si no, el pico de getrusage)"""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"): return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def _correr(accion):
+    t0 = time.perf_counter()
+    with _lock_runtime: accion()
+    return (time.perf_counter() - t0) * 1000
+
+def sesion(i, rondas, vivas):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=120)
+    vivas.append(at)  # la sesión sigue viva hasta el final, como una pestaña abierta
+    tiempos = {p: [] for p in PASOS}; errores = 0
+    for r in range(rondas):
+        try:
+            if r == 0: tiempos["home"].append(_correr(at.run))
+            else:
+                volver = next(b for b in at.button if b.label == "⬅️ Volver")
+                tiempos["home"].append(_correr(lambda: volver.click().run()))
+            domos = next(b for b in at.button if b.label == "🌾 Domos")
+            tiempos["domos"].append(_correr(lambda: domos.click().run()))
+            tiempos["cliente"].append(_correr(lambda: at.text_input(key="cli_txt_domo").input(f"Cliente {i}-{r}").run()))
+            boton = at.get("download_button")[0]
+            t0 = time.perf_counter(); _diferidos[boton.proto.deferred_file_id]()
+            tiempos["pdf"].append((time.perf_counter() - t0) * 1000)
+            if at.exception: errores += 1
+        except Exception:
+            errores += 1
+    return tiempos, errores
+
+def _percentiles(serie):
+    if not serie: return {"p50_ms": None, "p99_ms": None, "n": 0}
+    serie = sorted(serie)
+    return {"p50_ms": statistics.median(serie), "p99_ms": serie[min(len(serie) - 1, int(0.99 * len(serie)))], "n": len(serie)}
+
+def ejecutar(sesiones=10, rondas=3):
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    warnings.simplefilter("ignore")
+    aislar_datos(); _registrar_diferidos()
+    # Calentamiento: un recorrido completo importa streamlit y los módulos que la app
+    # carga de forma diferida (fpdf al descargar) antes de medir la RSS base
+    sesion(-1, 1, [])
+    motor_costos.CACHE_COTIZACIONES.limpiar(); cache_pdf.limpiar()
+    rss_inicio = rss_mb()
+    vivas = []
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sesiones) as pool:
+        resultados = list(pool.map(lambda i: sesion(i, rondas, vivas), range(sesiones)))
+    duracion = time.perf_counter() - t0
+    rss_fin = rss_mb()
+    por_paso = {p: [t for tiempos, _ in resultados for t in tiempos[p]] for p in PASOS}
+    flujos = [sum(ts) for tiempos, _ in resultados for ts in zip(*(tiempos[p] for p in PASOS))]
+    return {"fecha": datetime.now().isoformat(timespec="seconds"), "sesiones": sesiones, "rondas": rondas,
+            "duracion_s": duracion, "flujos_por_s": len(flujos) / duracion,
+            "errores": sum(e for _, e in resultados),
+            "flujo": _percentiles(flujos), "pasos": {p: _percentiles(ts) for p, ts in por_paso.items()},
+            "rss_inicio_mb": rss_inicio, "rss_fin_mb": rss_fin, "rss_por_sesion_mb": (rss_fin - rss_inicio) / sesiones,
+            "compartidos": {"cotizaciones": motor_costos.CACHE_COTIZACIONES.estadisticas(),
+                            "portafolios": cache_pdf.estadisticas(), "pdf_cotizacion": cache_pdf.estadisticas_cotizaciones(),
+                            "imagenes": catalogo_imagenes.estadisticas()}}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Prueba de carga local de la vitrina (AppTest, sin red)")
+    ap.add_argument("--sesiones", type=int, default=10)
+    ap.add_argument("--rondas", type=int, default=3, help="Recorridos home -> domos -> PDF por sesión")
+    ap.add_argument("--salida", help="JSON con el resultado completo")
+    args = ap.parse_args(argv)
+
+    r = ejecutar(args.sesiones, args.rondas)
+    print(f"{r['sesiones']} sesiones x {r['rondas']} rondas en {r['duracion_s']:.1f} s: "
+          f"{r['flujos_por_s']:.2f} flujos/s, {r['errores']} errores", file=sys.stderr)
+    for nombre, p in [("flujo", r["flujo"])] + list(r["pasos"].items()):
+        if p["n"]: print(f"  {nombre:<8} p50 {p['p50_ms']:>9.1f} ms   p99 {p['p99_ms']:>9.1f} ms", file=sys.stderr)
+    print(f"  RSS {r['rss_inicio_mb']:.0f} -> {r['rss_fin_mb']:.0f} MB ({r['rss_por_sesion_mb']:.2f} MB por sesión)", file=sys.stderr)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f: json.dump(r, f, indent=2)
+    return 1 if r["errores"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import argparse
+import atexit
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+# ==========================================
+# REGISTRO DE COTIZACIONES (PARQUET, SOLO AGREGAR)
+# ==========================================
+# Cada cotización mostrada ("cotizada", una por sesión y combinación de entradas)
+# y cada PDF entregado ("emitida") queda como una fila: entradas, desglose,
+# materiales, versión de precios y fecha. Las filas se acumulan en memoria y se
+# escriben por lotes como segmentos Parquet inmutables (LOTE filas o MAX_ESPERA_S
+# segundos, lo que ocurra primero, y al cerrar el proceso). La escritura corre en
+# un hilo aparte, nunca en el rerun de un visitante. Cada COMPACTAR_CADA segmentos
+# se unen en un compacto ordenado por fecha con estadísticas por grupo de filas,
+# así que consultar() lee solo las columnas y fechas pedidas. Los compactos van por
+# niveles: cada COMPACTAR_CADA de un nivel se funden en uno del siguiente (cmp-,
+# cmp2-, cmp3-...), así que la carpeta nunca pasa de COMPACTAR_CADA archivos por
+# nivel y los niveles crecen con el logaritmo de las filas.
+# Un escritor por carpeta (el proceso del servidor). Si el proceso muere justo
+# entre escribir un compacto y borrar sus fuentes, esas filas quedan duplicadas.
+# pyarrow se importa al escribir o consultar, nunca en el arranque de la vitrina.
+CARPETA_REGISTRO = os.environ.get("FERROTEK_REGISTRO", os.path.join('.cache', 'cotizaciones'))
+LOTE = 200
+MAX_ESPERA_S = 30
+COMPACTAR_CADA = 16  # segmentos que disparan una compactación
+FILAS_POR_GRUPO = 50_000
+EVENTOS = ("cotizada", "emitida")
+
+_log = logging.getLogger("ferrotek.registro")
+
+def _nivel(n):
+    # Prefijo de los compactos de cada nivel; el 1 conserva el nombre "cmp" de siempre
+    return "cmp" if n == 1 else f"cmp{n}"
+
+def esquema():
+    import pyarrow as pa
+    material = pa.struct([("Insumo", pa.string()), ("Unid", pa.string()), ("Cant", pa.float64()), ("Costo", pa.float64())])
+    return pa.schema([
+        ("fecha", pa.timestamp("ms")), ("evento", pa.string()), ("origen", pa.string()), ("sesion", pa.string()),
+        ("cliente", pa.string()), ("proyecto", pa.string()), ("linea", pa.string()), ("entrada", pa.string()),
+        ("acabados", pa.bool_()), ("version_precios", pa.int64()), ("margen", pa.float64()),
+        ("precio", pa.float64()), ("utilidad", pa.float64()),
+        ("costo_mat", pa.float64()), ("costo_mo", pa.float64()), ("costo_acab", pa.float64()),
+        ("materiales", pa.list_(material))])
+
+def fila(linea, entrada, incluye_acabados, resultado, margen, evento="cotizada", cliente=None, proyecto=None,
+         sesion=None, origen="vitrina", fecha=None):
+    """Fila del registro a partir de un resultado de calcular_proyecto"""
+    if evento not in EVENTOS: raise ValueError(f"Evento desconocido: {evento}")
+    desglose = resultado.get("desglose", {})
+    return {"fecha": fecha or datetime.now(), "evento": evento, "origen": origen, "sesion": sesion,
+            "cliente": cliente, "proyecto": proyecto, "linea": linea,
+            "entrada": json.dumps(entrada, sort_keys=True, ensure_ascii=False, default=str),
+            "acabados": bool(incluye_acabados), "version_precios": resultado.get("version_precios"),
+            "margen": float(margen), "precio": float(resultado["precio"]), "utilidad": float(resultado.get("utilidad", 0.0)),
+            "costo_mat": float(desglose.get("mat", 0.0)), "costo_mo": float(desglose.get("mo", 0.0)),
+            "costo_acab": float(desglose.get("acab", 0.0)),
+            "materiales": [{"Insumo": m["Insumo"], "Unid": m["Unid"], "Cant": float(m["Cant"]), "Costo": float(m["Costo"])}
+                           for m in resultado.get("materiales", [])]}
+
+def _instante(valor, fin=False):
+    # Fechas sin hora: "hasta" incluye el día completo
+    if isinstance(valor, str): valor = datetime.fromisoformat(valor) if "T" in valor or " " in valor else date.fromisoformat(valor)
+    if isinstance(valor, datetime): return valor
+    return datetime.combine(valor + timedelta(days=1) if fin else valor, datetime.min.time())
+
+class RegistroCotizaciones:
+    def __init__(self, carpeta=CARPETA_REGISTRO, lote=LOTE, max_espera_s=MAX_ESPERA_S, compactar_cada=COMPACTAR_CADA):
+        self.carpeta = carpeta; self.lote = lote; self.max_espera_s = max_espera_s; self.compactar_cada = compactar_cada
+        os.makedirs(carpeta, exist_ok=True)
+        self._lock = threading.Lock()            # buffer y contadores
+        self._lock_escritura = threading.Lock()  # un solo vaciado/compactación a la vez
+        self._buffer = []; self._temporizador = None
+        self.conteo = {"filas": 0, "segmentos": 0, "compactaciones": 0, "fusiones": 0}
+        atexit.register(self.vaciar)
+
+    def registrar(self, *args, **kwargs):
+        """Agrega una fila (mismos argumentos que fila()); el lote lleno se escribe en un hilo aparte"""
+        nueva = fila(*args, **kwargs)
+        with self._lock:
+            self._buffer.append(nueva)
+            lleno = len(self._buffer) >= self.lote
+            # Lote lleno: vaciado inmediato en un hilo (reemplaza la espera); si ya hay uno en curso, basta
+            if lleno and isinstance(self._temporizador, threading.Timer):
+                self._temporizador.cancel(); self._temporizador = None
+            if self._temporizador is None:
+                self._temporizador = (threading.Thread(target=self._vaciar_seguro) if lleno
+                                      else threading.Timer(self.max_espera_s, self._vaciar_seguro))
+                self._temporizador.daemon = True; self._temporizador.start()
+
+    def _vaciar_seguro(self):
+        # Hilo de fondo: un error de disco se registra en el log y las filas esperan al próximo vaciado
+        try:
+            self.vaciar()
+        except Exception:
+            _log.exception("No se pudo escribir el registro de cotizaciones en %s", self.carpeta)
+
+    def pendientes(self):
+        with self._lock: return len(self._buffer)
+
+    def archivos(self, prefijo=""):
+        return sorted(glob.glob(os.path.join(self.carpeta, f"{prefijo}*.parquet")))
+
+    def _rutas(self, prefijo):
+        nombre = f"{prefijo}-{time.time_ns()}-{os.getpid()}.parquet"
+        # pyarrow.dataset ignora los archivos que empiezan por "_": nadie lee uno a medio escribir
+        return os.path.join(self.carpeta, "_" + nombre), os.path.join(self.carpeta, nombre)
+
+    def _escribir(self, tabla, prefijo):
+        import pyarrow.parquet as pq
+        temporal, ruta = self._rutas(prefijo)
+        pq.write_table(tabla, temporal, compression="zstd", row_group_size=FILAS_POR_GRUPO)
+        os.replace(temporal, ruta)
+        return ruta
+
+    def _fundir(self, fuentes, prefijo):
+        # Por lotes de filas, en orden de archivo (ya van por fecha): la memoria no crece con el nivel
+        import pyarrow.parquet as pq
+        temporal, ruta = self._rutas(prefijo); filas = 0
+        with pq.ParquetWriter(temporal, esquema(), compression="zstd") as salida:
+            for a in fuentes:
+                for lote in pq.ParquetFile(a).iter_batches(batch_size=FILAS_POR_GRUPO):
+                    salida.write_batch(lote, row_group_size=FILAS_POR_GRUPO); filas += lote.num_rows
+        os.replace(temporal, ruta)
+        return ruta, filas
+
+    def vaciar(self):
+        """Escribe lo acumulado como un segmento nuevo; devuelve su ruta (None si no había filas)"""
+        with self._lock_escritura:
+            with self._lock:
+                filas, self._buffer = self._buffer, []
+                if isinstance(self._temporizador, threading.Timer): self._temporizador.cancel()
+                self._temporizador = None
+            if not filas: return None
+            try:
+                import pyarrow as pa
+                ruta = self._escribir(pa.Table.from_pylist(filas, schema=esquema()), "seg")
+            except Exception:
+                with self._lock: self._buffer[:0] = filas  # se reintentan en el próximo vaciado
+                raise
+            with self._lock: self.conteo["filas"] += len(filas); self.conteo["segmentos"] += 1
+            _log.info("registro: %d cotizaciones en %s", len(filas), os.path.basename(ruta))
+            segmentos = len(self.archivos("seg-"))
+        if segmentos >= self.compactar_cada: self.compactar()
+        return ruta
+
+    def compactar(self):
+        """Une los segmentos en un compacto ordenado por fecha y funde los niveles llenos; devuelve la última ruta escrita"""
+        with self._lock_escritura:
+            ruta = None
+            segmentos = self.archivos("seg-")
+            if len(segmentos) >= 2:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                tabla = pa.concat_tables([pq.read_table(a, schema=esquema()) for a in segmentos]).sort_by("fecha")
+                ruta = self._escribir(tabla, _nivel(1))
+                for a in segmentos: os.remove(a)
+                with self._lock: self.conteo["compactaciones"] += 1
+                _log.info("registro: %d segmentos compactados en %s (%d filas)", len(segmentos), os.path.basename(ruta), tabla.num_rows)
+            nivel = 1; fuentes = self.archivos(_nivel(1) + "-")
+            while len(fuentes) >= self.compactar_cada:
+                ruta, filas = self._fundir(fuentes, _nivel(nivel + 1))
+                for a in fuentes: os.remove(a)
+                with self._lock: self.conteo["fusiones"] += 1
+                _log.info("registro: %d compactos de nivel %d fundidos en %s (%d filas)", len(fuentes), nivel, os.path.basename(ruta), filas)
+                nivel += 1; fuentes = self.archivos(_nivel(nivel) + "-")
+            return ruta
+
+    def consultar(self, columnas=None, desde=None, hasta=None, donde=None):
+        """DataFrame con solo `columnas`, fechas en [desde, hasta] y columnas iguales a `donde` ({col: valor})"""
+        self.vaciar()
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        condiciones = [ds.field(c) == v for c, v in (donde or {}).items()]
+        if desde is not None: condiciones.append(ds.field("fecha") >= pa.scalar(_instante(desde), pa.timestamp("ms")))
+        if hasta is not None: condiciones.append(ds.field("fecha") < pa.scalar(_instante(hasta, fin=True), pa.timestamp("ms")))
+        filtro = None
+        for c in condiciones: filtro = c if filtro is None else filtro & c
+        # Las estadísticas min/max de cada grupo de filas descartan los que quedan fuera del filtro
+        datos = ds.dataset(self.archivos(), format="parquet", schema=esquema())
+        return datos.to_table(columns=columnas, filter=filtro).to_pandas()
+
+    def estadisticas(self):
+        with self._lock: est = {"pendientes": len(self._buffer), **self.conteo}
+        est["archivos"] = len(self.archivos())
+        return est
+
+_registros = {}
+_lock_registros = threading.Lock()
+
+def obtener_registro(carpeta=CARPETA_REGISTRO):
+    """Instancia única por carpeta y por proceso (la comparten todas las sesiones)"""
+    with _lock_registros:
+        if carpeta not in _registros: _registros[carpeta] = RegistroCotizaciones(carpeta)
+        return _registros[carpeta]
+
+# ==========================================
+# LÍNEA DE COMANDOS
+# ==========================================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Consulta el registro de cotizaciones (Parquet)")
+    ap.add_argument("--carpeta", default=CARPETA_REGISTRO)
+    ap.add_argument("--columnas", nargs="*", help="Columnas a leer (por defecto todas menos materiales)")
+    ap.add_argument("--desde", help="Fecha ISO inicial (incluida)")
+    ap.add_argument("--hasta", help="Fecha ISO final (incluida)")
+    ap.add_argument("--linea", help="Solo una línea: domo, muro, casa, agua")
+    ap.add_argument("--evento", choices=EVENTOS)
+    ap.add_argument("--compactar", action="store_true", help="Compactar antes de consultar")
+    ap.add_argument("--salida", help="CSV de salida (si no, imprime la tabla)")
+    args = ap.parse_args(argv)
+
+    registro = obtener_registro(args.carpeta)
+    if args.compactar: registro.compactar()
+    columnas = args.columnas or [c for c in esquema().names if c != "materiales"]
+    donde = {k: v for k, v in (("linea", args.linea), ("evento", args.evento)) if v}
+    df = registro.consultar(columnas, args.desde, args.hasta, donde)
+    if args.salida: df.to_csv(args.salida, index=False)
+    else: print(df.to_string(index=False))
+    print(f"{len(df)} cotizaciones, {len(registro.archivos())} archivos en {args.carpeta}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import numpy as np
+import motor_lotes
+from motor_costos import MARGEN_BASE, PRECIOS_BASE
+
+# ==========================================
+# RIESGO DE PRECIOS (MONTE CARLO)
+# ==========================================
+# La cotización fija el precio por VIGENCIA_DIAS, pero los insumos se compran
+# después. Se muestrean factores de variación para cada clave de la lista de
+# precios y se recotiza el proyecto en una sola pasada de motor_lotes (los
+# precios van como arreglos de n muestras). La utilidad real de cada muestra es
+# precio cotizado - costo simulado.
+VIGENCIA_DIAS = 15
+# Desviación estándar de la variación relativa durante la vigencia
+VARIACION = {'cemento_gris_50kg': 0.05, 'cal_hidratada_25kg': 0.05, 'arena_rio_m3': 0.04, 'malla_5mm_m2': 0.08,
+             'perfil_pgc90_ml': 0.10, 'dia_cuadrilla': 0.02, 'valor_acabados_m2': 0.04, 'valor_acabados_vis_m2': 0.04}
+VARIACION_DEFECTO = 0.05
+CORRELACION = 0.4  # peso del factor común (acero, cemento y fletes suelen moverse juntos)
+
+def muestrear(precios, n, variacion=None, tendencia=None, correlacion=CORRELACION, semilla=None):
+    """n escenarios por clave: precio * factor lognormal de media 1 (+ tendencia), con un factor común"""
+    variacion = {**VARIACION, **(variacion or {})}; tendencia = tendencia or {}
+    claves = list(precios)
+    sigma = np.array([variacion.get(k, VARIACION_DEFECTO) for k in claves])[:, None]
+    deriva = np.array([tendencia.get(k, 0.0) for k in claves])[:, None]
+    rng = np.random.default_rng(semilla)
+    z = np.sqrt(correlacion) * rng.standard_normal(n) + np.sqrt(1 - correlacion) * rng.standard_normal((len(claves), n))
+    factores = np.exp(sigma * z - sigma**2 / 2) * (1 + deriva)
+    return {k: precios[k] * f for k, f in zip(claves, factores)}
+
+def simular(linea_negocio, input_data, precios=PRECIOS_BASE, margen=MARGEN_BASE, incluye_acabados=True,
+            n=100_000, umbral=0.15, variacion=None, tendencia=None, correlacion=CORRELACION, semilla=None):
+    """Distribución de utilidad y margen si los precios se mueven antes de comprar"""
+    cotizado = float(motor_lotes.cotizar_lote(linea_negocio, input_data, precios, margen, incluye_acabados)["precio"])
+    escenarios = muestrear(precios, n, variacion, tendencia, correlacion, semilla)
+    res = motor_lotes.cotizar_lote(linea_negocio, input_data, escenarios, margen, incluye_acabados)
+    costo = np.broadcast_to(res["precio"] - res["utilidad"], (n,))
+    utilidad = cotizado - costo
+    margen_real = utilidad / cotizado
+    p = np.percentile(utilidad, [5, 50, 95])
+    return {"precio": cotizado, "utilidad": utilidad, "margen": margen_real,
+            "p_bajo_umbral": float(np.mean(margen_real < umbral)), "p_perdida": float(np.mean(utilidad < 0)),
+            "p5": float(p[0]), "p50": float(p[1]), "p95": float(p[2]), "umbral": umbral, "n": n}
@@ -0,0 +1,82 @@
+import numpy as np
+import motor_lotes
+from motor_costos import MARGEN_BASE, PRECIOS_BASE
+
+# ==========================================
+# SOLUCIONADOR INVERSO ("¿QUÉ CONSTRUYO CON $X?")
+# ==========================================
+# Líneas de la vitrina: se evalúa toda la grilla de dimensiones en una sola
+# pasada vectorizada (motor_lotes) y se elige la mayor opción que cabe en el
+# presupuesto; no se asume monotonía porque los redondeos de material crean
+# escalones. CoreFerrotek (escalar, monótono no decreciente en el largo): búsqueda
+# binaria sobre la grilla, ~15 evaluaciones. Todo devuelve None si nada alcanza.
+MODELOS_CASA = {"T-1 (30m2)": (30, 'Tradicional'), "T-2 (48m2)": (48, 'Tradicional'), "T-3 (70m2)": (70, 'Tradicional'),
+                "M-2 (45m2)": (45, 'Serie M'), "M-3 (70m2)": (70, 'Serie M')}
+
+def _mejor(factible, orden):
+    if not factible.any(): return None
+    idx = np.flatnonzero(factible)
+    return idx[np.argmax(orden[idx])]
+
+def domo(presupuesto, precios=PRECIOS_BASE, margen=MARGEN_BASE, incluye_acabados=True, ancho=None,
+         anchos=None, fondos=None):
+    """Mayor domo (área de planta) dentro del presupuesto; ancho fijo -> mayor fondo"""
+    anchos = motor_lotes.rango(2.0, 15.0) if anchos is None else np.asarray(anchos, dtype=float)
+    fondos = motor_lotes.rango(3.0, 50.0) if fondos is None else np.asarray(fondos, dtype=float)
+    if ancho is not None: anchos = np.array([float(ancho)])
+    A, F = np.meshgrid(anchos, fondos, indexing='ij')
+    A = A.ravel(); F = F.ravel()
+    res = motor_lotes.cotizar_domos(A, F, precios, margen, incluye_acabados)
+    i = _mejor(res["precio"] <= presupuesto, A * F + F * 1e-9)  # desempate: más fondo
+    if i is None: return None
+    return {"ancho": float(A[i]), "fondo": float(F[i]), "precio": float(res["precio"][i]), "h": float(res["geo"]["h"][i])}
+
+def muro(presupuesto, altura=2.2, tipo="Tipo 2 (Sencillo)", precios=PRECIOS_BASE, margen=MARGEN_BASE, largos=None):
+    """Mayor largo de muro para el tipo y alto dados"""
+    largos = motor_lotes.rango(1.0, 1000.0) if largos is None else np.asarray(largos, dtype=float)
+    res = motor_lotes.cotizar_muros(largos, altura, "Doble" in tipo, precios, margen)
+    i = _mejor(res["precio"] <= presupuesto, largos)
+    if i is None: return None
+    return {"ml": float(largos[i]), "altura": altura, "tipo": tipo, "precio": float(res["precio"][i])}
+
+def tanque(presupuesto, precios=PRECIOS_BASE, margen=MARGEN_BASE, litros=None):
+    """Mayor tanque (litros) dentro del presupuesto"""
+    litros = np.arange(1000, 20001, 1000) if litros is None else np.asarray(litros)
+    res = motor_lotes.cotizar_tanques(litros / 1000, precios, margen)
+    i = _mejor(res["precio"] <= presupuesto, litros)
+    if i is None: return None
+    return {"litros": int(litros[i]), "precio": float(res["precio"][i])}
+
+def casas(presupuesto, precios=PRECIOS_BASE, margen=MARGEN_BASE):
+    """Modelos del catálogo que caben en el presupuesto (con y sin acabados), del más grande al más chico"""
+    nombres = list(MODELOS_CASA)
+    areas = np.array([MODELOS_CASA[n][0] for n in nombres])
+    trad = np.array([MODELOS_CASA[n][1] == 'Tradicional' for n in nombres])
+    opciones = []
+    for acab in (True, False):
+        precio = motor_lotes.cotizar_casas(areas, trad, precios, margen, acab)["precio"]
+        opciones += [{"modelo": n, "area": int(a), "llave_en_mano": acab, "precio": float(p)}
+                     for n, a, p in zip(nombres, areas, precio) if p <= presupuesto]
+    return sorted(opciones, key=lambda o: (-o["area"], not o["llave_en_mano"], o["precio"]))
+
+def _mayor_monotono(valores, precio_fn, presupuesto):
+    # Búsqueda binaria del último valor cuyo precio cabe; precio_fn no decreciente
+    lo, hi = 0, len(valores) - 1
+    if precio_fn(valores[lo]) > presupuesto: return None
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if precio_fn(valores[mid]) <= presupuesto: lo = mid
+        else: hi = mid - 1
+    return float(valores[lo])
+
+def boveda_v58(presupuesto, core, largos=None):
+    """CoreFerrotek: mayor largo de bóveda (3.80 m de luz) dentro del presupuesto"""
+    largos = motor_lotes.rango(1.0, 200.0) if largos is None else np.asarray(largos, dtype=float)
+    largo = _mayor_monotono(largos, lambda x: core.calcular_boveda_v58(float(x)), presupuesto)
+    return None if largo is None else {"largo": largo, "precio": core.calcular_boveda_v58(largo)}
+
+def muro_perimetral(presupuesto, core, largos=None):
+    """CoreFerrotek: mayor longitud de muro perimetral dentro del presupuesto"""
+    largos = motor_lotes.rango(1.0, 5000.0) if largos is None else np.asarray(largos, dtype=float)
+    ml = _mayor_monotono(largos, lambda x: core.calcular_muro_perimetral(float(x)), presupuesto)
+    return None if ml is None else {"ml": ml, "precio": core.calcular_muro_perimetral(ml)}